@@ -38,6 +38,7 @@ class Settings(BaseSettings):
 
     # NWS API viewed via gridpoint forecast data
     nws_base_url: str = "https://api.weather.gov"
+    forecast_max_concurrency: int = 10
 
     # USGS Water Data API
     usgs_water_url: str = "https://waterservices.usgs.gov/nwis/iv/"
@@ -97,10 +98,14 @@ COASTAL_STATIONS = [
     "Whitehall St-South Ferry",
     "Coney Island-Stillwell Av",
 ]
+COASTAL_STATION_SET = frozenset(COASTAL_STATIONS)
 
 # Valid boroughs
 VALID_BOROUGHS = ["Manhattan", "Brooklyn", "Queens", "Bronx", "Staten Island"]
 
+# MTA borough abbreviations to full names
+BOROUGH_MAP = {"M": "Manhattan", "Bk": "Brooklyn", "Q": "Queens", "Bx": "Bronx", "SI": "Staten Island"}
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,18 +1,21 @@
 import asyncio
+import os
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 from typing import Optional
 
+import numpy as np
+import pandas as pd
 from fastapi import FastAPI, HTTPException, Query, Response
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.config import COASTAL_STATIONS, VALID_BOROUGHS, get_settings
+from app.config import BOROUGH_MAP, COASTAL_STATION_SET, VALID_BOROUGHS, get_settings
 from app.models import (
     CurrentStatusResponse,
     FullReportResponse,
     ReportFormat,
-    RiskLevel,
     StationDetailResponse,
     StationReport,
     TidesResponse,
@@ -23,17 +26,48 @@ from app.services.stations import stations_service
 from app.services.tides import tides_service
 from app.services.cdo import cdo_service
 from app.services.forecast import forecast_service
-from app.utils.excel import generate_csv_report, generate_excel_report
-from app.utils.risk import calculate_predicted_risk, calculate_risk, calculate_risk_with_reason
+from app.services.http_client import close_http_client
+from app.utils.excel import generate_csv_report, generate_excel_report_file, shutdown_excel_pool
+from app.utils.risk import (
+    AT_RISK_CODE,
+    HIGH_CODE,
+    LOW_CODE,
+    RISK_LEVELS,
+    calculate_predicted_risk,
+    calculate_risk_batch,
+    calculate_risk_with_reason,
+    get_risk_code_summary,
+)
 
 settings = get_settings()
 
+NY_TZ = ZoneInfo("America/New_York")
+
+# Short-lived cache for /api/current
+_current_status_cache: Optional[CurrentStatusResponse] = None
+_current_status_time: Optional[datetime] = None
+_current_status_ttl = timedelta(seconds=30)
+_current_status_lock = asyncio.Lock()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load station data on startup; release pooled connections and workers on shutdown."""
+    await stations_service.load_stations()
+    missing = settings.validate_required()
+    if missing:
+        raise RuntimeError(f"Missing required config: {', '.join(missing)}")
+    yield
+    await close_http_client()
+    shutdown_excel_pool()
+
+
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="Flood risk monitoring API for NYC MTA subway stations using NOAA MRMS precipitation data and tide levels.",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -45,39 +79,96 @@ app.add_middleware(
 )
 
 
+def _is_current_status_cache_valid() -> bool:
+    """Check if the cached /api/current response is still valid."""
+    if _current_status_time is None:
+        return False
+    return datetime.now(timezone.utc) - _current_status_time < _current_status_ttl
+
+
+async def _unavailable_on_error(coro, source: str):
+    """Await an upstream fetch, surfacing any failure as a 503."""
+    try:
+        return await coro
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"{source} data unavailable: {str(e)}",
+        )
+
+
+async def _gather_or_cancel(*aws):
+    """Like asyncio.gather, but a failure cancels the fetches still running.
+
+    Plain gather leaves siblings running after the first error (e.g. the 503
+    from _unavailable_on_error), spending NWS quota on a failed request.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        # Wait for the cancellations so nothing outlives the request
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class _TempFileResponse(FileResponse):
+    """FileResponse that deletes its file however the send ends.
+
+    A background task only runs after a complete send, so a client
+    disconnect or a rejected Range header would leave the file behind.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            os.remove(self.path)
+
+
+def _coastal_mask(stations_df: pd.DataFrame) -> np.ndarray:
+    """Boolean mask of stations that should have tide data applied, computed once per request."""
+    mask = stations_df["station_name"].isin(COASTAL_STATION_SET).to_numpy()
+    if "is_coastal" in stations_df.columns:
+        mask = mask | stations_df["is_coastal"].fillna(False).to_numpy(dtype=bool)
+    return mask
+
+
+def _station_risk(stations_df: pd.DataFrame, coastal_mask: np.ndarray, tide_level: Optional[float]) -> np.ndarray:
+    """Vectorized current risk level codes for every station in the frame."""
+    tide = np.nan if tide_level is None else tide_level
+    return calculate_risk_batch(
+        stations_df["structure"].to_numpy(),
+        stations_df["precip_rate_in_hr"].fillna(0).to_numpy(),
+        stations_df["accum_6hr_in"].fillna(0).to_numpy(),
+        np.where(coastal_mask, tide, np.nan),
+        coastal_mask,
+    )
+
+
 async def _fetch_forecasts_for_stations(stations_df):
     """Fetch forecast totals for unique lat/lon keys to reduce calls."""
     # Deduplicate by rounded lat/lon to reuse gridpoint responses
     key_to_coords = {}
-    for _, row in stations_df.iterrows():
-        lat = float(row["latitude"])
-        lon = float(row["longitude"])
+    for lat, lon in zip(stations_df["latitude"].to_numpy(), stations_df["longitude"].to_numpy()):
+        lat = float(lat)
+        lon = float(lon)
         key = f"{round(lat, 3)},{round(lon, 3)}"
         if key not in key_to_coords:
             key_to_coords[key] = (lat, lon)
 
-    semaphore = asyncio.Semaphore(10)
-    results = {}
-
-    async def _fetch(key, lat, lon):
-        async with semaphore:
-            totals = await forecast_service.get_forecast_totals(lat, lon)
-            results[key] = totals
-
-    tasks = [_fetch(k, v[0], v[1]) for k, v in key_to_coords.items()]
-    if tasks:
-        await asyncio.gather(*tasks)
-
-    return results
-
+    # NWS rate-limits aggressively; the limiter backs off on 429/5xx
+    limiter = forecast_service.limiter
+    totals = await asyncio.gather(
+        *[
+            limiter.run(forecast_service.get_forecast_totals(lat, lon))
+            for lat, lon in key_to_coords.values()
+        ]
+    )
 
-@app.on_event("startup")
-async def startup_event():
-    """Load station data on startup."""
-    await stations_service.load_stations()
-    missing = settings.validate_required()
-    if missing:
-        raise RuntimeError(f"Missing required config: {', '.join(missing)}")
+    return dict(zip(key_to_coords.keys(), totals))
 
 
 @app.get("/")
@@ -121,10 +212,9 @@ async def get_report(
         )
 
     # Get report date
-    local_tz = ZoneInfo("America/New_York")
-    generated_at = datetime.now(timezone.utc)
-    generated_local = generated_at.astimezone(local_tz)
-    report_date = date or generated_local.strftime("%Y-%m-%d")
+    generated_local = datetime.now(NY_TZ)
+    today = generated_local.strftime("%Y-%m-%d")
+    report_date = date or today
     try:
         report_date_obj = datetime.strptime(report_date, "%Y-%m-%d").date()
     except ValueError:
@@ -138,16 +228,13 @@ async def get_report(
             requested_local = datetime.strptime(report_date, "%Y-%m-%d").replace(
                 hour=parsed_time.hour,
                 minute=parsed_time.minute,
-                tzinfo=local_tz,
+                tzinfo=NY_TZ,
             )
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid time format. Use HH:MM (24-hour).")
-    if not time:
-        requested_local = generated_local
 
-    is_today = report_date == generated_local.strftime("%Y-%m-%d")
-    now_local = generated_local
-    use_historical = requested_local < now_local - timedelta(minutes=5)
+    is_today = report_date == today
+    use_historical = requested_local < generated_local - timedelta(minutes=5)
     use_forecast = is_today
 
     try:
@@ -160,52 +247,69 @@ async def get_report(
                     stations_df["station_name"].str.lower().isin(station_list)
                 ]
 
-        # Get precipitation data
-        try:
+        requested_utc = requested_local.astimezone(timezone.utc)
+
+        async def _fetch_precipitation(df):
             if use_historical:
-                stations_df, _ = await stage4_service.get_station_precipitation_at_time(
-                    stations_df,
-                    requested_local.astimezone(timezone.utc),
+                precip_df, _ = await stage4_service.get_station_precipitation_at_time(
+                    df, requested_utc
                 )
-            else:
-                stations_df = await mrms_service.get_station_precipitation(stations_df)
-        except Exception as e:
-            raise HTTPException(
-                status_code=503,
-                detail=f"NOAA precipitation data unavailable: {str(e)}",
-            )
-
-        # Get tide level for coastal stations
-        if use_historical:
-            tide_level = await tides_service.get_tide_level_at_time(
-                requested_local.astimezone(timezone.utc)
-            )
-        else:
-            tide_level = await tides_service.get_current_tide_level()
-
-        # Fetch daily totals from NCEI CDO (Central Park, JFK, LaGuardia)
-        cdo_totals = await cdo_service.get_daily_precip_totals(report_date)
-
-        # Pre-fetch forecasts for unique gridpoints when report is for today
-        forecast_map = {}
-        if use_forecast:
-            forecast_map = await _fetch_forecasts_for_stations(stations_df)
+                return precip_df
+            return await mrms_service.get_station_precipitation(df)
+
+        # Precipitation, tide level for coastal stations, daily totals from
+        # NCEI CDO (Central Park, JFK, LaGuardia) and, for today, forecasts for
+        # unique gridpoints are independent, so fetch them concurrently.
+        # With risk_only, forecasts wait until LOW stations are filtered out.
+        prefetch_forecasts = use_forecast and not risk_only
+        fetches = [
+            _unavailable_on_error(_fetch_precipitation(stations_df), "NOAA precipitation"),
+            tides_service.get_tide_level_at_time(requested_utc)
+            if use_historical
+            else tides_service.get_current_tide_level(),
+            cdo_service.get_daily_precip_totals(report_date),
+        ]
+        if prefetch_forecasts:
+            fetches.append(_fetch_forecasts_for_stations(stations_df))
+        results = await _gather_or_cancel(*fetches)
+        stations_df, tide_level, cdo_totals = results[:3]
+        forecast_map = results[3] if prefetch_forecasts else {}
+
+        coastal_mask = _coastal_mask(stations_df)
+        risk_arr = _station_risk(stations_df, coastal_mask, tide_level)
+
+        # Filter if risk_only is requested. Predicted risk never changes the
+        # current risk level, so LOW stations can be dropped before forecasting.
+        if risk_only:
+            keep = risk_arr != LOW_CODE
+            stations_df = stations_df[keep]
+            coastal_mask = coastal_mask[keep]
+            risk_arr = risk_arr[keep]
+            if use_forecast:
+                forecast_map = await _fetch_forecasts_for_stations(stations_df)
 
         # Build station reports
+        records = stations_df.to_dict(orient="records")
+        rounded_tide = round(tide_level, 2) if tide_level else None
+        # Fields are already typed, so skip per-row validation outside debug mode
+        build_station_report = StationReport if settings.debug else StationReport.model_construct
         station_reports = []
-        for _, row in stations_df.iterrows():
-            is_coastal = row.get("is_coastal", False) or row["station_name"] in COASTAL_STATIONS
+        for rec, is_coastal, risk_code in zip(records, coastal_mask, risk_arr):
+            structure = rec["structure"]
             station_tide = tide_level if is_coastal else None
-            cbd_value = row.get("cbd")
+            cbd_value = rec.get("cbd")
             if isinstance(cbd_value, bool):
                 cbd_value = "Y" if cbd_value else "N"
             elif cbd_value is not None:
                 cbd_value = str(cbd_value)
 
-            risk, risk_reason = calculate_risk_with_reason(
-                structure=row["structure"],
-                precip_rate_in_hr=row.get("precip_rate_in_hr", 0),
-                accum_6hr_in=row.get("accum_6hr_in", 0),
+            # The level comes from the batch result that the filter and counts
+            # use; the scalar rules only supply the reason text
+            risk = RISK_LEVELS[risk_code]
+            _, risk_reason = calculate_risk_with_reason(
+                structure=structure,
+                precip_rate_in_hr=rec.get("precip_rate_in_hr", 0),
+                accum_6hr_in=rec.get("accum_6hr_in", 0),
                 tide_level_ft=station_tide,
                 is_coastal=is_coastal,
             )
@@ -216,14 +320,14 @@ async def get_report(
             predicted_risk_24hr = None
 
             if use_forecast:
-                key = f"{round(float(row['latitude']), 3)},{round(float(row['longitude']), 3)}"
+                key = f"{round(float(rec['latitude']), 3)},{round(float(rec['longitude']), 3)}"
                 forecast_6hr_in, forecast_24hr_in, _ = forecast_map.get(
                     key, (None, None, None)
                 )
 
                 if forecast_6hr_in is not None:
                     predicted_risk_6hr = calculate_predicted_risk(
-                        structure=row["structure"],
+                        structure=structure,
                         forecast_total_in=forecast_6hr_in,
                         window_hours=6,
                         tide_level_ft=station_tide,
@@ -232,34 +336,29 @@ async def get_report(
 
                 if forecast_24hr_in is not None:
                     predicted_risk_24hr = calculate_predicted_risk(
-                        structure=row["structure"],
+                        structure=structure,
                         forecast_total_in=forecast_24hr_in,
                         window_hours=24,
                         tide_level_ft=station_tide,
                         is_coastal=is_coastal,
                     )
 
-            # Filter if risk_only is requested
-            if risk_only and risk == RiskLevel.LOW:
-                continue
-
             # Map borough abbreviation to full name
-            borough_map = {"M": "Manhattan", "Bk": "Brooklyn", "Q": "Queens", "Bx": "Bronx", "SI": "Staten Island"}
-            full_borough = borough_map.get(row["borough"], row["borough"])
+            full_borough = BOROUGH_MAP.get(rec["borough"], rec["borough"])
 
-            report = StationReport(
-                line=row.get("line"),
-                station_name=row["station_name"],
+            report = build_station_report(
+                line=rec.get("line"),
+                station_name=rec["station_name"],
                 borough=full_borough,
                 cbd=cbd_value,
-                daytime_routes=row.get("daytime_routes"),
-                structure=row["structure"],
-                latitude=row["latitude"],
-                longitude=row["longitude"],
-                precip_rate_in_hr=round(row.get("precip_rate_in_hr", 0), 4),
-                accum_1hr_in=round(row.get("accum_1hr_in", 0), 4),
-                accum_6hr_in=round(row.get("accum_6hr_in", 0), 4),
-                tide_level_ft=round(station_tide, 2) if station_tide else None,
+                daytime_routes=rec.get("daytime_routes"),
+                structure=structure,
+                latitude=rec["latitude"],
+                longitude=rec["longitude"],
+                precip_rate_in_hr=round(rec.get("precip_rate_in_hr", 0), 4),
+                accum_1hr_in=round(rec.get("accum_1hr_in", 0), 4),
+                accum_6hr_in=round(rec.get("accum_6hr_in", 0), 4),
+                tide_level_ft=rounded_tide if is_coastal else None,
                 central_park_daily_in=cdo_totals.get("central_park_daily_in"),
                 central_park_daily_date=cdo_totals.get("central_park_daily_date"),
                 jfk_daily_in=cdo_totals.get("jfk_daily_in"),
@@ -280,39 +379,39 @@ async def get_report(
             )
             station_reports.append(report)
 
-        # Count risk levels
-        high_count = sum(1 for s in station_reports if s.risk_level == RiskLevel.HIGH)
-        at_risk_count = sum(1 for s in station_reports if s.risk_level == RiskLevel.AT_RISK)
+        # Count risk levels from the vectorized result (same rules as the reasons)
+        risk_summary = get_risk_code_summary(risk_arr)
 
         # Handle different output formats
         if format == ReportFormat.XLSX:
-            excel_file = generate_excel_report(station_reports, report_date, requested_local)
+            # Built in a worker process so the workbook doesn't hold up the event loop
+            excel_path = await generate_excel_report_file(station_reports, report_date, requested_local)
             filename = f"mta_precp_{report_date}.xlsx"
-            return StreamingResponse(
-                excel_file,
+            return _TempFileResponse(
+                excel_path,
                 media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 headers={"Content-Disposition": f"attachment; filename={filename}"},
             )
 
         if format == ReportFormat.CSV:
-            csv_content = generate_csv_report(station_reports, report_date, requested_local)
             filename = f"mta_precp_{report_date}.csv"
-            return Response(
-                content=csv_content,
+            return StreamingResponse(
+                generate_csv_report(station_reports, report_date, requested_local),
                 media_type="text/csv",
                 headers={"Content-Disposition": f"attachment; filename={filename}"},
             )
 
-        # Default: JSON response
-        return FullReportResponse(
+        # Default: JSON response, serialized to bytes by pydantic-core in one pass
+        full_report = FullReportResponse(
             generated_at=requested_local,
             report_date=report_date,
             source="NOAA MRMS; NOAA CDO; NWS",
             station_count=len(station_reports),
-            high_risk_count=high_count,
-            at_risk_count=at_risk_count,
+            high_risk_count=risk_summary["high_risk_count"],
+            at_risk_count=risk_summary["at_risk_count"],
             stations=station_reports,
         )
+        return Response(content=full_report.model_dump_json(), media_type="application/json")
 
     except HTTPException:
         raise
@@ -326,52 +425,50 @@ async def get_current_status():
     Get a quick snapshot of current high-risk stations.
 
     Returns lists of station names currently at HIGH or AT RISK levels.
+    Responses are reused for a short TTL so polling clients share one
+    upstream fetch.
     """
-    try:
-        stations_df = await stations_service.get_stations()
+    global _current_status_cache, _current_status_time
+
+    if _is_current_status_cache_valid():
+        return _current_status_cache
+
+    async with _current_status_lock:
+        # Another request may have refreshed the cache while we waited
+        if _is_current_status_cache_valid():
+            return _current_status_cache
 
         try:
-            stations_df = await mrms_service.get_station_precipitation(stations_df)
-        except Exception as e:
-            raise HTTPException(
-                status_code=503,
-                detail=f"NOAA MRMS data unavailable: {str(e)}",
-            )
+            stations_df = await stations_service.get_stations()
 
-        tide_level = await tides_service.get_current_tide_level()
+            stations_df, tide_level = await _gather_or_cancel(
+                _unavailable_on_error(mrms_service.get_station_precipitation(stations_df), "NOAA MRMS"),
+                tides_service.get_current_tide_level(),
+            )
 
-        high_risk = []
-        at_risk = []
+            coastal_mask = _coastal_mask(stations_df)
+            risk_arr = _station_risk(stations_df, coastal_mask, tide_level)
+            station_names = stations_df["station_name"].to_numpy()
 
-        for _, row in stations_df.iterrows():
-            is_coastal = row.get("is_coastal", False) or row["station_name"] in COASTAL_STATIONS
-            station_tide = tide_level if is_coastal else None
+            high_risk = station_names[risk_arr == HIGH_CODE].tolist()
+            at_risk = station_names[risk_arr == AT_RISK_CODE].tolist()
 
-            risk = calculate_risk(
-                structure=row["structure"],
-                precip_rate_in_hr=row.get("precip_rate_in_hr", 0),
-                accum_6hr_in=row.get("accum_6hr_in", 0),
-                tide_level_ft=station_tide,
-                is_coastal=is_coastal,
+            response = CurrentStatusResponse(
+                timestamp=datetime.now(NY_TZ),
+                high_risk_stations=high_risk,
+                at_risk_stations=at_risk,
+                high_risk_count=len(high_risk),
+                at_risk_count=len(at_risk),
             )
 
-            if risk == RiskLevel.HIGH:
-                high_risk.append(row["station_name"])
-            elif risk == RiskLevel.AT_RISK:
-                at_risk.append(row["station_name"])
-
-        return CurrentStatusResponse(
-            timestamp=datetime.now(timezone.utc).astimezone(ZoneInfo("America/New_York")),
-            high_risk_stations=high_risk,
-            at_risk_stations=at_risk,
-            high_risk_count=len(high_risk),
-            at_risk_count=len(at_risk),
-        )
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error getting status: {str(e)}")
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error getting status: {str(e)}")
+        _current_status_cache = response
+        _current_status_time = datetime.now(timezone.utc)
+        return response
 
 
 @app.get("/api/station/{station_name}", response_model=StationDetailResponse)
@@ -390,22 +487,26 @@ async def get_station_detail(station_name: str):
             detail=f"Station '{station_name}' not found",
         )
 
-    try:
-        precip_data = await mrms_service.get_single_station_precipitation(
-            station["latitude"],
-            station["longitude"],
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=503,
-            detail=f"NOAA MRMS data unavailable: {str(e)}",
-        )
-
-    is_coastal = station.get("is_coastal", False) or station["station_name"] in COASTAL_STATIONS
-    tide_level = None
-
+    is_coastal = station.get("is_coastal", False) or station["station_name"] in COASTAL_STATION_SET
+    now_local = datetime.now(NY_TZ)
+    report_date = now_local.strftime("%Y-%m-%d")
+
+    fetches = [
+        _unavailable_on_error(
+            mrms_service.get_single_station_precipitation(
+                station["latitude"],
+                station["longitude"],
+            ),
+            "NOAA MRMS",
+        ),
+        cdo_service.get_daily_precip_totals(report_date),
+        forecast_service.get_forecast_totals(station["latitude"], station["longitude"]),
+    ]
     if is_coastal:
-        tide_level = await tides_service.get_current_tide_level()
+        fetches.append(tides_service.get_current_tide_level())
+    results = await _gather_or_cancel(*fetches)
+    precip_data, cdo_totals, (forecast_6hr_in, forecast_24hr_in, _) = results[:3]
+    tide_level = results[3] if is_coastal else None
 
     risk, risk_reason = calculate_risk_with_reason(
         structure=station["structure"],
@@ -415,13 +516,6 @@ async def get_station_detail(station_name: str):
         is_coastal=is_coastal,
     )
 
-    report_date = datetime.now(timezone.utc).astimezone(ZoneInfo("America/New_York")).strftime("%Y-%m-%d")
-    cdo_totals = await cdo_service.get_daily_precip_totals(report_date)
-
-    forecast_6hr_in, forecast_24hr_in = await forecast_service.get_forecast_totals(
-        station["latitude"], station["longitude"]
-    )
-
     predicted_risk_6hr = None
     predicted_risk_24hr = None
     if forecast_6hr_in is not None:
@@ -441,12 +535,10 @@ async def get_station_detail(station_name: str):
             is_coastal=is_coastal,
         )
 
-    borough_map = {"M": "Manhattan", "Bk": "Brooklyn", "Q": "Queens", "Bx": "Bronx", "SI": "Staten Island"}
-
     return StationDetailResponse(
         station_id=str(station["station_id"]),
         station_name=station["station_name"],
-        borough=borough_map.get(station["borough"], station["borough"]),
+        borough=BOROUGH_MAP.get(station["borough"], station["borough"]),
         structure=station["structure"],
         latitude=station["latitude"],
         longitude=station["longitude"],
@@ -469,7 +561,7 @@ async def get_station_detail(station_name: str):
         risk_reason=risk_reason,
         is_coastal=is_coastal,
         source="NOAA MRMS; NOAA CDO; NWS",
-        last_updated=datetime.now(timezone.utc).astimezone(ZoneInfo("America/New_York")),
+        last_updated=now_local,
     )
 
 
@@ -490,7 +582,7 @@ async def get_tides():
             )
 
         return TidesResponse(
-            timestamp=datetime.now(timezone.utc).astimezone(ZoneInfo("America/New_York")),
+            timestamp=datetime.now(NY_TZ),
             readings=readings,
         )
 
@@ -505,9 +597,11 @@ async def health_check():
     """
     Check availability of all data sources.
     """
-    mrms_available = await mrms_service.is_available()
-    tides_available = await tides_service.is_available()
-    cdo_available = await cdo_service.is_available()
+    mrms_available, tides_available, cdo_available = await asyncio.gather(
+        mrms_service.is_available(),
+        tides_service.is_available(),
+        cdo_service.is_available(),
+    )
     station_count = await stations_service.get_station_count()
 
     return {
@@ -518,7 +612,7 @@ async def health_check():
             "cdo": "available" if cdo_available else "unavailable",
             "stations": f"{station_count} loaded" if station_count > 0 else "not loaded",
         },
-        "timestamp": datetime.now(timezone.utc).astimezone(ZoneInfo("America/New_York")).isoformat(),
+        "timestamp": datetime.now(NY_TZ).isoformat(),
     }
 
 
@@ -1,26 +1,54 @@
-from datetime import datetime, timedelta
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-import httpx
+import orjson
+from cachetools import TTLCache
 
 from app.config import get_settings
+from app.services.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
 
 
 class CDOService:
     """Service for fetching daily precipitation totals from NCEI CDO (GHCN-Daily)."""
 
+    STATION_KEYS = ("central_park", "jfk", "lga")
+
     def __init__(self):
         self.settings = get_settings()
+        # Values observed on the report date itself are final; anything
+        # missing or filled from a fallback day may still be published.
+        self._final_cache: TTLCache = TTLCache(maxsize=256, ttl=24 * 60 * 60)
+        self._provisional_cache: TTLCache = TTLCache(maxsize=256, ttl=5 * 60)
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._last_success: Optional[datetime] = None
+        self._availability_ttl = timedelta(seconds=60)
+
+    def _get_cached(self, report_date: str) -> Optional[dict]:
+        """Return cached totals for a report date, if they can be reused."""
+        totals = self._final_cache.get(report_date)
+        if totals is None:
+            totals = self._provisional_cache.get(report_date)
+        return totals
+
+    def _store(self, report_date: str, totals: dict) -> None:
+        if all((totals[f"{k}_daily_date"] or "").startswith(report_date) for k in self.STATION_KEYS):
+            self._final_cache[report_date] = totals
+        else:
+            self._provisional_cache[report_date] = totals
 
     def _build_headers(self) -> dict:
         token = self.settings.ncei_cdo_token
         return {"token": token} if token else {}
 
     async def _fetch_station_daily_precip(
-        self, station_id: str, report_date: str
+        self, station_id: str, start_date: str, end_date: Optional[str] = None
     ) -> tuple[Optional[float], Optional[str]]:
         """
-        Fetch daily precipitation total for a station on a given date.
+        Fetch the most recent daily precipitation total for a station in a date range.
 
         Returns (value_in_inches, date_string) if CDO is configured for standard units.
         """
@@ -28,69 +56,85 @@ class CDOService:
             "datasetid": "GHCND",
             "datatypeid": "PRCP",
             "stationid": station_id,
-            "startdate": report_date,
-            "enddate": report_date,
+            "startdate": start_date,
+            "enddate": end_date or start_date,
             "units": "standard",
             "limit": 1000,
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.settings.ncei_cdo_base_url,
-                    params=params,
-                    headers=self._build_headers(),
-                    timeout=15.0,
-                )
-                response.raise_for_status()
-                data = response.json()
-
-            results = data.get("results", [])
-            if not results:
-                return None, None
+            response = await get_http_client().get(
+                self.settings.ncei_cdo_base_url,
+                params=params,
+                headers=self._build_headers(),
+                timeout=15.0,
+            )
+            response.raise_for_status()
+            self._last_success = datetime.now(timezone.utc)
+            data = orjson.loads(response.content)
 
             # GHCN-Daily PRCP in standard units is expected to be inches.
-            value = results[0].get("value")
-            if value is None:
-                return None, None
-
-            try:
-                return float(value), results[0].get("date")
-            except (TypeError, ValueError):
-                return None, None
+            # Newest day with a usable value wins.
+            results = sorted(data.get("results", []), key=lambda r: r.get("date") or "", reverse=True)
+            for result in results:
+                try:
+                    return float(result["value"]), result.get("date")
+                except (KeyError, TypeError, ValueError):
+                    continue
+            return None, None
 
-        except Exception as e:
-            print(f"Error fetching CDO data for {station_id}: {e}")
+        except Exception:
+            logger.exception("Error fetching CDO data for %s", station_id)
             return None, None
 
     async def _fetch_with_fallback(
         self, station_id: str, report_date: str, fallback_days: int = 7
     ) -> tuple[Optional[float], Optional[str]]:
         """Fetch daily precip for report_date, fallback to most recent within fallback_days."""
-        value, date_str = await self._fetch_station_daily_precip(station_id, report_date)
-        if value is not None:
-            return value, date_str
-
-        # Try previous days up to fallback_days
         try:
             base_date = datetime.strptime(report_date, "%Y-%m-%d")
         except ValueError:
             return None, None
 
-        for i in range(1, fallback_days + 1):
-            candidate = (base_date - timedelta(days=i)).strftime("%Y-%m-%d")
-            value, date_str = await self._fetch_station_daily_precip(station_id, candidate)
-            if value is not None:
-                return value, date_str
-
-        return None, None
+        # One ranged query covers the report date and every fallback day
+        start_date = (base_date - timedelta(days=fallback_days)).strftime("%Y-%m-%d")
+        return await self._fetch_station_daily_precip(station_id, start_date, report_date)
 
     async def get_daily_precip_totals(self, report_date: str) -> dict[str, Optional[float]]:
         """Fetch daily precipitation totals for Central Park, JFK, and LaGuardia."""
+        totals = self._get_cached(report_date)
+        if totals is not None:
+            return totals
+
+        lock = self._locks.setdefault(report_date, asyncio.Lock())
+        try:
+            async with lock:
+                # Another request may have filled the cache while we waited
+                totals = self._get_cached(report_date)
+                if totals is not None:
+                    return totals
+                totals = await self._fetch_totals(report_date)
+                self._store(report_date, totals)
+                return totals
+        finally:
+            # Locks are keyed by the requested date; drop them once no one waits
+            if not lock.locked() and self._locks.get(report_date) is lock:
+                del self._locks[report_date]
+
+    async def _fetch_totals(self, report_date: str) -> dict:
+        """Query all three stations at once."""
         settings = self.settings
-        cp, cp_date = await self._fetch_with_fallback(settings.ghcnd_central_park_station, report_date)
-        jfk, jfk_date = await self._fetch_with_fallback(settings.ghcnd_jfk_station, report_date)
-        lga, lga_date = await self._fetch_with_fallback(settings.ghcnd_lga_station, report_date)
+        results = await asyncio.gather(
+            self._fetch_with_fallback(settings.ghcnd_central_park_station, report_date),
+            self._fetch_with_fallback(settings.ghcnd_jfk_station, report_date),
+            self._fetch_with_fallback(settings.ghcnd_lga_station, report_date),
+            return_exceptions=True,
+        )
+        # One station failing should not blank out the others
+        (cp, cp_date), (jfk, jfk_date), (lga, lga_date) = [
+            (None, None) if isinstance(result, BaseException) else result
+            for result in results
+        ]
 
         return {
             "central_park_daily_in": cp,
@@ -103,6 +147,13 @@ class CDOService:
 
     async def is_available(self) -> bool:
         """Check if CDO is available."""
+        # Any recent successful call answers the question without another probe
+        if (
+            self._last_success is not None
+            and datetime.now(timezone.utc) - self._last_success < self._availability_ttl
+        ):
+            return True
+
         try:
             params = {
                 "datasetid": "GHCND",
@@ -113,14 +164,16 @@ class CDOService:
                 "units": "standard",
                 "limit": 1,
             }
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.settings.ncei_cdo_base_url,
-                    params=params,
-                    headers=self._build_headers(),
-                    timeout=10.0,
-                )
-                return response.status_code == 200
+            response = await get_http_client().get(
+                self.settings.ncei_cdo_base_url,
+                params=params,
+                headers=self._build_headers(),
+                timeout=10.0,
+            )
+            if response.status_code != 200:
+                return False
+            self._last_success = datetime.now(timezone.utc)
+            return True
         except Exception:
             return False
 
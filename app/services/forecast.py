@@ -1,10 +1,24 @@
+import asyncio
+import logging
 import re
-from datetime import datetime, timedelta, timezone
-from typing import Optional
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Awaitable, Callable, Optional, TypeVar
 
 import httpx
+import numpy as np
+import orjson
+from cachetools import TTLCache
 
 from app.config import get_settings
+from app.utils.concurrency import AIMDLimiter, parse_retry_after
+from app.services.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MM_TO_IN = 1 / 25.4
 
 
 class ForecastService:
@@ -16,21 +30,41 @@ class ForecastService:
 
     def __init__(self):
         self.settings = get_settings()
-        self._points_cache: dict[str, dict] = {}
-        self._grid_cache: dict[str, dict] = {}
-        self._cache_time: dict[str, datetime] = {}
-        self._cache_ttl = timedelta(minutes=30)
-
-    def _cache_key_for_point(self, lat: float, lon: float) -> str:
+        # Bounded LRU caches with a 30 minute TTL; expired entries are evicted
+        self._points_cache: TTLCache = TTLCache(maxsize=1024, ttl=30 * 60)
+        self._grid_cache: TTLCache = TTLCache(maxsize=1024, ttl=30 * 60)
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.limiter = AIMDLimiter(max_limit=self.settings.forecast_max_concurrency)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _cache_key_for_point(lat: float, lon: float) -> str:
+        # Stations sit on a fixed set of coordinates, so this is nearly always a hit
         return f"{round(lat, 3)},{round(lon, 3)}"
 
-    def _is_cache_valid(self, key: str) -> bool:
-        cached_at = self._cache_time.get(key)
-        if not cached_at:
-            return False
-        return datetime.now(timezone.utc) - cached_at < self._cache_ttl
+    def _record_response(self, response: httpx.Response) -> None:
+        """Feed NWS throttling signals back into the concurrency limiter."""
+        if response.status_code == 429 or response.status_code >= 500:
+            self.limiter.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+        elif response.is_success:
+            self.limiter.on_success()
+
+    async def _single_flight(
+        self, key: str, fetch: Callable[[], Awaitable[Optional[T]]]
+    ) -> Optional[T]:
+        """Run fetch once per key; concurrent callers for the same key share the result."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one caller being cancelled does not cancel the shared fetch
+        return await asyncio.shield(task)
 
     def _parse_duration_hours(self, duration: str) -> float:
+        # NWS almost always sends whole hours ("PT1H", "PT6H"); skip the regex for those
+        if duration.startswith("PT") and duration.endswith("H") and duration[2:-1].isdigit():
+            return float(duration[2:-1])
         match = self._duration_re.match(duration)
         if not match:
             return 0.0
@@ -43,46 +77,53 @@ class ForecastService:
         # Example: "2026-01-25T14:00:00+00:00/PT1H"
         if "/" not in valid_time:
             return datetime.now(timezone.utc), 0.0
-        start_str, duration_str = valid_time.split("/", 1)
+        start_str, _, duration_str = valid_time.partition("/")
         start = datetime.fromisoformat(start_str.replace("Z", "+00:00"))
         hours = self._parse_duration_hours(duration_str)
         return start, hours
 
     async def _fetch_points(self, lat: float, lon: float) -> Optional[dict]:
         key = self._cache_key_for_point(lat, lon)
-        if key in self._points_cache and self._is_cache_valid(key):
-            return self._points_cache[key]
+        cached = self._points_cache.get(key)
+        if cached is not None:
+            return cached
+        return await self._single_flight(key, lambda: self._download_points(lat, lon, key))
 
+    async def _download_points(self, lat: float, lon: float, key: str) -> Optional[dict]:
         url = f"{self.settings.nws_base_url}/points/{lat},{lon}"
-        headers = {"User-Agent": "mta-flood-api"}
-
         try:
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                response = await client.get(url, headers=headers, timeout=15.0)
-                response.raise_for_status()
-                data = response.json()
-                self._points_cache[key] = data
-                self._cache_time[key] = datetime.now(timezone.utc)
-                return data
-        except Exception as e:
-            print(f"Error fetching NWS points for {lat},{lon}: {e}")
+            client = get_http_client()
+            response = await client.get(url, timeout=15.0)
+            self._record_response(response)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            self._points_cache[key] = data
+            return data
+        except Exception:
+            logger.exception("Error fetching NWS points for %s,%s", lat, lon)
             return None
 
-    async def _fetch_grid(self, grid_url: str) -> Optional[dict]:
-        if grid_url in self._grid_cache and self._is_cache_valid(grid_url):
-            return self._grid_cache[grid_url]
+    async def _fetch_grid(self, grid_url: str) -> Optional[list[dict]]:
+        """Fetch the QPF periods for a gridpoint; only that subtree is kept in the cache."""
+        cached = self._grid_cache.get(grid_url)
+        if cached is not None:
+            return cached
+        return await self._single_flight(grid_url, lambda: self._download_grid(grid_url))
 
-        headers = {"User-Agent": "mta-flood-api"}
+    async def _download_grid(self, grid_url: str) -> Optional[list[dict]]:
         try:
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                response = await client.get(grid_url, headers=headers, timeout=15.0)
-                response.raise_for_status()
-                data = response.json()
-                self._grid_cache[grid_url] = data
-                self._cache_time[grid_url] = datetime.now(timezone.utc)
-                return data
-        except Exception as e:
-            print(f"Error fetching NWS grid data: {e}")
+            client = get_http_client()
+            response = await client.get(grid_url, timeout=15.0)
+            self._record_response(response)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            # The grid carries ~40 weather layers; only the QPF periods are used
+            qpf = data.get("properties", {}).get("quantitativePrecipitation", {})
+            values = qpf.get("values", [])
+            self._grid_cache[grid_url] = values
+            return values
+        except Exception:
+            logger.exception("Error fetching NWS grid data from %s", grid_url)
             return None
 
     async def get_forecast_totals(
@@ -99,19 +140,16 @@ class ForecastService:
         if not grid_url:
             return None, None, None
 
-        grid = await self._fetch_grid(grid_url)
-        if not grid:
+        values = await self._fetch_grid(grid_url)
+        if values is None:
             return None, None, None
-
-        qpf = grid.get("properties", {}).get("quantitativePrecipitation", {})
-        values = qpf.get("values", [])
         if not values:
             return None, None, grid_url
 
-        now = datetime.now(timezone.utc)
-        total_6h_mm = 0.0
-        total_24h_mm = 0.0
-
+        # Collect the usable periods, then do the window overlap math on arrays
+        starts = []
+        durations = []
+        amounts_mm = []
         for entry in values:
             valid_time = entry.get("validTime")
             value_mm = entry.get("value")
@@ -121,32 +159,27 @@ class ForecastService:
             start, hours = self._parse_valid_time(valid_time)
             if hours <= 0:
                 continue
-
-            # Skip past periods
-            if start + timedelta(hours=hours) <= now:
-                continue
-
-            # Portion overlap with next 6h and 24h windows
-            window_6_end = now + timedelta(hours=6)
-            window_24_end = now + timedelta(hours=24)
-
-            period_end = start + timedelta(hours=hours)
-            overlap_6 = max(
-                0.0,
-                (min(period_end, window_6_end) - max(start, now)).total_seconds() / 3600.0,
-            )
-            overlap_24 = max(
-                0.0,
-                (min(period_end, window_24_end) - max(start, now)).total_seconds() / 3600.0,
-            )
-
-            if overlap_6 > 0:
-                total_6h_mm += value_mm * (overlap_6 / hours)
-            if overlap_24 > 0:
-                total_24h_mm += value_mm * (overlap_24 / hours)
-
-        # Convert mm to inches
-        return total_6h_mm / 25.4, total_24h_mm / 25.4, grid_url
+            starts.append(start.timestamp())
+            durations.append(hours)
+            amounts_mm.append(value_mm)
+
+        if not starts:
+            return 0.0, 0.0, grid_url
+
+        duration_s = np.array(durations, dtype=np.float64) * 3600.0
+        start_ts = np.array(starts, dtype=np.float64)
+        end_ts = start_ts + duration_s
+        # Inches per second over each period; mm->in and the 1/duration are folded in once
+        rates = np.array(amounts_mm, dtype=np.float64) * (MM_TO_IN / duration_s)
+
+        # Seconds of each period overlapping the next 6h and 24h windows;
+        # periods already past clip to zero overlap
+        now_ts = datetime.now(timezone.utc).timestamp()
+        overlap_start = np.maximum(start_ts, now_ts)
+        overlap_6 = np.clip(np.minimum(end_ts, now_ts + 6 * 3600.0) - overlap_start, 0.0, None)
+        overlap_24 = np.clip(np.minimum(end_ts, now_ts + 24 * 3600.0) - overlap_start, 0.0, None)
+
+        return float(rates @ overlap_6), float(rates @ overlap_24), grid_url
 
 
 forecast_service = ForecastService()
@@ -1,4 +1,5 @@
 import gzip
+import logging
 import os
 import tempfile
 from datetime import datetime, timedelta, timezone
@@ -6,13 +7,13 @@ from pathlib import Path
 from typing import Optional
 
 import boto3
-import httpx
 import numpy as np
 import pandas as pd
 from botocore import UNSIGNED
 from botocore.config import Config
 
 from app.config import get_settings
+from app.services.http_client import get_http_client
 
 settings = get_settings()
 if not os.environ.get("ECCODES_DEFINITION_PATH"):
@@ -22,6 +23,8 @@ if not os.environ.get("ECCODES_SAMPLES_PATH"):
 
 import pygrib
 
+logger = logging.getLogger(__name__)
+
 
 class MRMSService:
     """Service for fetching NOAA MRMS precipitation data from AWS S3 bucket"""
@@ -110,8 +113,8 @@ class MRMSService:
 
             return None
 
-        except Exception as e:
-            print(f"Error listing MRMS files: {e}")
+        except Exception:
+            logger.exception("Error listing MRMS files")
             return None
 
     async def download_and_parse_grib(self, key: str) -> Optional[np.ndarray]:
@@ -142,8 +145,8 @@ class MRMSService:
 
                 return data
 
-        except Exception as e:
-            print(f"Error downloading/parsing GRIB: {e}")
+        except Exception:
+            logger.exception("Error downloading/parsing GRIB")
             return None
 
     async def download_and_parse_grib_http(self, url: str) -> Optional[np.ndarray]:
@@ -152,13 +155,13 @@ class MRMSService:
             is_gzip = url.endswith(".gz")
             suffix = ".grib2.gz" if is_gzip else ".grib2"
             with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp_file:
-                async with httpx.AsyncClient(follow_redirects=True) as client:
-                    response = await client.get(url, timeout=30.0)
-                    response.raise_for_status()
-                    content_type = response.headers.get("Content-Type", "")
-                    if "gzip" not in content_type and "octet-stream" not in content_type:
-                        return None
-                    tmp_file.write(response.content)
+                client = get_http_client()
+                response = await client.get(url, timeout=30.0)
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "")
+                if "gzip" not in content_type and "octet-stream" not in content_type:
+                    return None
+                tmp_file.write(response.content)
 
                 if is_gzip:
                     grib_path = tmp_file.name.replace(".gz", "")
@@ -178,8 +181,8 @@ class MRMSService:
                     Path(grib_path).unlink(missing_ok=True)
 
                 return data
-        except Exception as e:
-            print(f"Error downloading/parsing GRIB via HTTP: {e}")
+        except Exception:
+            logger.exception("Error downloading/parsing GRIB via HTTP")
             return None
 
     def _build_http_url(self, product: str, timestamp: datetime) -> str:
@@ -215,26 +218,26 @@ class MRMSService:
         if not http_product:
             return None
 
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            for offset in offsets:
-                candidate = base_time + timedelta(minutes=offset)
+        client = get_http_client()
+        for offset in offsets:
+            candidate = base_time + timedelta(minutes=offset)
+            if base_source == "archive":
+                url = self._build_archive_url(http_product, candidate)
+            else:
+                url = self._build_http_url(http_product, candidate)
+            try:
                 if base_source == "archive":
-                    url = self._build_archive_url(http_product, candidate)
+                    probe = await client.get(
+                        url, headers={"Range": "bytes=0-0"}, timeout=15.0
+                    )
+                    if probe.status_code in (200, 206):
+                        return url
                 else:
-                    url = self._build_http_url(http_product, candidate)
-                try:
-                    if base_source == "archive":
-                        probe = await client.get(
-                            url, headers={"Range": "bytes=0-0"}, timeout=15.0
-                        )
-                        if probe.status_code in (200, 206):
-                            return url
-                    else:
-                        head = await client.head(url, timeout=10.0)
-                        if head.status_code == 200:
-                            return url
-                except Exception:
-                    continue
+                    head = await client.head(url, timeout=10.0)
+                    if head.status_code == 200:
+                        return url
+            except Exception:
+                continue
 
         return None
 
@@ -407,12 +410,12 @@ class MRMSService:
 
         url = f"{self.settings.mrms_http_base_url}/{http_product}/MRMS_{http_product}.latest.grib2.gz"
         try:
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                head = await client.head(url, timeout=10.0)
-                if head.status_code == 200:
-                    return True
-                response = await client.get(url, timeout=10.0)
-                return response.status_code == 200
+            client = get_http_client()
+            head = await client.head(url, timeout=10.0)
+            if head.status_code == 200:
+                return True
+            response = await client.get(url, timeout=10.0)
+            return response.status_code == 200
         except Exception:
             return False
 
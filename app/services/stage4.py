@@ -1,4 +1,5 @@
 import gzip
+import logging
 import os
 import re
 import tempfile
@@ -6,11 +7,11 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Optional
 
-import httpx
 import numpy as np
 import pandas as pd
 
 from app.config import get_settings
+from app.services.http_client import get_http_client
 
 settings = get_settings()
 if not os.environ.get("ECCODES_DEFINITION_PATH"):
@@ -20,6 +21,8 @@ if not os.environ.get("ECCODES_SAMPLES_PATH"):
 
 import pygrib
 
+logger = logging.getLogger(__name__)
+
 
 class Stage4Service:
     """Service for fetching historical NCEP Stage IV hourly precipitation from IEM archive."""
@@ -49,17 +52,13 @@ class Stage4Service:
         text = ""
         for url in urls:
             try:
-                async with httpx.AsyncClient(follow_redirects=True) as client:
-                    response = await client.get(
-                        url,
-                        headers={"User-Agent": "mta-flood-api"},
-                        timeout=20.0,
-                    )
-                    if response.status_code == 200 and response.text:
-                        text = response.text
-                        break
-            except Exception as e:
-                print(f"Stage IV directory fetch failed for {url}: {e}")
+                client = get_http_client()
+                response = await client.get(url, timeout=20.0)
+                if response.status_code == 200 and response.text:
+                    text = response.text
+                    break
+            except Exception:
+                logger.exception("Stage IV directory fetch failed for %s", url)
 
         # Extract href targets
         links = re.findall(r'href="([^"]+)"', text)
@@ -121,12 +120,12 @@ class Stage4Service:
         for base in self._archive_dirs(date):
             url = f"{base}{filename}"
             try:
-                async with httpx.AsyncClient(follow_redirects=True) as client:
-                    probe = await client.get(
-                        url, headers={"Range": "bytes=0-0"}, timeout=10.0
-                    )
-                    if probe.status_code in (200, 206):
-                        break
+                client = get_http_client()
+                probe = await client.get(
+                    url, headers={"Range": "bytes=0-0"}, timeout=10.0
+                )
+                if probe.status_code in (200, 206):
+                    break
             except Exception:
                 continue
         if not url:
@@ -135,10 +134,10 @@ class Stage4Service:
             is_gzip = filename.endswith(".gz")
             suffix = ".grib2.gz" if is_gzip else ".grib2"
             with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp_file:
-                async with httpx.AsyncClient(follow_redirects=True) as client:
-                    response = await client.get(url, timeout=30.0)
-                    response.raise_for_status()
-                    tmp_file.write(response.content)
+                client = get_http_client()
+                response = await client.get(url, timeout=30.0)
+                response.raise_for_status()
+                tmp_file.write(response.content)
 
                 if is_gzip:
                     grib_path = tmp_file.name.replace(".gz", "")
@@ -163,8 +162,8 @@ class Stage4Service:
                     Path(grib_path).unlink(missing_ok=True)
 
                 return data
-        except Exception as e:
-            print(f"Error fetching Stage IV file {filename}: {e}")
+        except Exception:
+            logger.exception("Error fetching Stage IV file %s", filename)
             return None
 
     def _nearest_indices(self, lats: np.ndarray, lons: np.ndarray, lat: float, lon: float) -> tuple[int, int]:
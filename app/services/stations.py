@@ -1,3 +1,5 @@
+import json
+import logging
 import os
 from pathlib import Path
 from typing import Optional
@@ -5,7 +7,26 @@ from typing import Optional
 import httpx
 import pandas as pd
 
-from app.config import COASTAL_STATIONS, get_settings
+from app.config import BOROUGH_MAP, COASTAL_STATION_SET, get_settings
+from app.services.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# MTA CSV headers and the columns the API keeps them as
+STATION_COLUMNS = {
+    "Station ID": "station_id",
+    "Line": "line",
+    "Stop Name": "station_name",
+    "Borough": "borough",
+    "CBD": "cbd",
+    "Daytime Routes": "daytime_routes",
+    "Structure": "structure",
+    "GTFS Latitude": "latitude",
+    "GTFS Longitude": "longitude",
+}
+
+# Bump whenever _normalize_dataframe changes, so stale sidecars are rebuilt
+SIDECAR_VERSION = 2
 
 
 class StationsService:
@@ -14,9 +35,15 @@ class StationsService:
     def __init__(self):
         self.settings = get_settings()
         self._stations_df: Optional[pd.DataFrame] = None
+        self._coastal_df: Optional[pd.DataFrame] = None
+        self._names_lower: Optional[pd.Series] = None
+        self._stations_by_name: dict[str, dict] = {}
 
     async def load_stations(self, force_refresh: bool = False) -> pd.DataFrame:
         """Load MTA stations from cache or download from MTA."""
+        if not force_refresh and self._stations_df is not None:
+            return self._stations_df
+
         cache_path = Path(self.settings.stations_cache_path)
 
         if not force_refresh and cache_path.exists():
@@ -25,56 +52,119 @@ class StationsService:
         return await self._download_and_cache(cache_path)
 
     def _load_from_cache(self, cache_path: Path) -> pd.DataFrame:
-        """Load stations from local cache."""
-        df = pd.read_csv(cache_path)
-        self._stations_df = self._normalize_dataframe(df)
+        """Load stations from local cache, preferring the normalized sidecar."""
+        sidecar_path = cache_path.with_suffix(".pkl")
+        if sidecar_path.exists() and sidecar_path.stat().st_mtime >= cache_path.stat().st_mtime:
+            try:
+                df = self._read_sidecar(sidecar_path)
+            except Exception as e:
+                logger.warning("Ignoring unreadable stations sidecar %s: %s", sidecar_path, e)
+                df = None
+            if df is not None:
+                self._set_stations(df)
+                return self._stations_df
+
+        df = self._normalize_dataframe(pd.read_csv(cache_path))
+        self._write_sidecar(df, sidecar_path)
+        self._set_stations(df)
         return self._stations_df
 
+    def _read_meta(self, meta_path: Path) -> dict:
+        """Read the saved validators for the stations CSV."""
+        try:
+            return json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, meta_path: Path, response: httpx.Response) -> None:
+        """Save the ETag/Last-Modified validators from a stations download."""
+        meta = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        try:
+            meta_path.write_text(json.dumps(meta))
+        except OSError as e:
+            logger.warning("Error writing stations metadata %s: %s", meta_path, e)
+
+    def _read_sidecar(self, sidecar_path: Path) -> Optional[pd.DataFrame]:
+        """Read the normalized frame, or None if it was written by another normalization."""
+        sidecar = pd.read_pickle(sidecar_path)
+        if not isinstance(sidecar, dict) or sidecar.get("version") != SIDECAR_VERSION:
+            logger.info("Ignoring stations sidecar %s from another version", sidecar_path)
+            return None
+        df = sidecar.get("stations")
+        expected = set(STATION_COLUMNS.values()) | {"is_coastal"}
+        if not isinstance(df, pd.DataFrame) or not {"station_name", "is_coastal"} <= set(df.columns) <= expected:
+            logger.info("Ignoring stations sidecar %s with unexpected columns", sidecar_path)
+            return None
+        return df
+
+    def _write_sidecar(self, df: pd.DataFrame, sidecar_path: Path) -> None:
+        """Persist the normalized frame so later loads skip CSV parsing."""
+        try:
+            pd.to_pickle({"version": SIDECAR_VERSION, "stations": df}, sidecar_path)
+        except Exception as e:
+            logger.warning("Error writing stations sidecar %s: %s", sidecar_path, e)
+
     async def _download_and_cache(self, cache_path: Path) -> pd.DataFrame:
         """Download stations from MTA and cache locally."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                self.settings.mta_stations_url,
-                timeout=30.0
-            )
-            response.raise_for_status()
+        meta_path = cache_path.with_suffix(".meta.json")
+        headers = {}
+        if cache_path.exists():
+            # Revalidate instead of re-downloading an unchanged CSV
+            meta = self._read_meta(meta_path)
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        client = get_http_client()
+        response = await client.get(
+            self.settings.mta_stations_url,
+            headers=headers,
+            timeout=30.0
+        )
+        if response.status_code == 304:
+            return self._load_from_cache(cache_path)
+        response.raise_for_status()
 
         cache_path.parent.mkdir(parents=True, exist_ok=True)
         cache_path.write_text(response.text)
+        self._write_meta(meta_path, response)
 
-        df = pd.read_csv(cache_path)
-        self._stations_df = self._normalize_dataframe(df)
+        df = self._normalize_dataframe(pd.read_csv(cache_path))
+        self._write_sidecar(df, cache_path.with_suffix(".pkl"))
+        self._set_stations(df)
         return self._stations_df
 
-    def _normalize_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Normalize column names and add computed fields."""
-        column_mapping = {
-            "Station ID": "station_id",
-            "Complex ID": "complex_id",
-            "GTFS Stop ID": "gtfs_stop_id",
-            "Division": "division",
-            "Line": "line",
-            "Stop Name": "station_name",
-            "Borough": "borough",
-            "CBD": "cbd",
-            "Daytime Routes": "daytime_routes",
-            "Structure": "structure",
-            "GTFS Latitude": "latitude",
-            "GTFS Longitude": "longitude",
-            "North Direction Label": "north_label",
-            "South Direction Label": "south_label",
-        }
+    def _set_stations(self, df: pd.DataFrame) -> None:
+        """Store the normalized stations and index them by lowercase name."""
+        self._stations_df = df
+        self._coastal_df = df[df["is_coastal"]]
+        self._names_lower = df["station_name"].str.lower()
+        by_name: dict[str, dict] = {}
+        for record in df.to_dict(orient="records"):
+            name = record.get("station_name")
+            if isinstance(name, str):
+                # Several stations share a name; keep the first, like iloc[0]
+                by_name.setdefault(name.strip().lower(), record)
+        self._stations_by_name = by_name
 
-        df = df.rename(columns=column_mapping)
+    def _normalize_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Normalize column names, keep the columns the API uses, and add computed fields."""
+        df = df.rename(columns=STATION_COLUMNS)
 
-        available_cols = [col for col in column_mapping.values() if col in df.columns]
+        available_cols = [col for col in STATION_COLUMNS.values() if col in df.columns]
         df = df[available_cols].copy()
 
         df["station_id"] = df["station_id"].astype(str)
+        # A handful of distinct values each; store as small integer codes
+        for col in ("borough", "structure"):
+            if col in df.columns:
+                df[col] = df[col].astype("category")
 
-        df["is_coastal"] = df["station_name"].apply(
-            lambda x: x in COASTAL_STATIONS if pd.notna(x) else False
-        )
+        df["is_coastal"] = df["station_name"].isin(COASTAL_STATION_SET)
 
         return df
 
@@ -83,49 +173,36 @@ class StationsService:
         if self._stations_df is None:
             await self.load_stations()
 
-        df = self._stations_df.copy()
-
-        if borough:
-            borough_map = {
-                "M": "Manhattan",
-                "Bk": "Brooklyn",
-                "Q": "Queens",
-                "Bx": "Bronx",
-                "SI": "Staten Island",
-            }
-            df["borough_full"] = df["borough"].map(borough_map).fillna(df["borough"])
-            df = df[df["borough_full"].str.lower() == borough.lower()]
-            df = df.drop(columns=["borough_full"])
+        df = self._stations_df
+        if not borough:
+            # Shared frame; callers copy before adding columns
+            return df
 
-        return df
+        # Maps the categories rather than every row
+        borough_full = df["borough"].map(lambda code: BOROUGH_MAP.get(code, code))
+        return df[borough_full.str.lower() == borough.lower()]
 
     async def get_station_by_name(self, station_name: str) -> Optional[dict]:
         """Get a single station by name."""
         if self._stations_df is None:
             await self.load_stations()
 
-        matches = self._stations_df[
-            self._stations_df["station_name"].str.lower() == station_name.lower()
-        ]
-
-        if matches.empty:
-            matches = self._stations_df[
-                self._stations_df["station_name"].str.lower().str.contains(
-                    station_name.lower(), regex=False
-                )
-            ]
+        station = self._stations_by_name.get(station_name.strip().lower())
+        if station is not None:
+            return dict(station)
 
-        if matches.empty:
+        matches = self._names_lower.str.contains(station_name.lower(), regex=False, na=False)
+        if not matches.any():
             return None
 
-        return matches.iloc[0].to_dict()
+        return self._stations_df.iloc[matches.to_numpy().argmax()].to_dict()
 
     async def get_coastal_stations(self) -> pd.DataFrame:
         """Get only coastal stations."""
         if self._stations_df is None:
             await self.load_stations()
 
-        return self._stations_df[self._stations_df["is_coastal"] == True].copy()
+        return self._coastal_df
 
     async def get_station_count(self) -> int:
         """Get total number of stations."""
@@ -1,10 +1,26 @@
+import asyncio
+import logging
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-import httpx
+import orjson
 
 from app.config import get_settings
 from app.models import TideReading
+from app.services.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_noaa_timestamp(value: str) -> datetime:
+    """Parse a NOAA GMT timestamp like "2026-01-23 14:30" without strptime."""
+    try:
+        return datetime(
+            int(value[0:4]), int(value[5:7]), int(value[8:10]),
+            int(value[11:13]), int(value[14:16]), tzinfo=timezone.utc,
+        )
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
 
 
 class TidesService:
@@ -20,6 +36,7 @@ class TidesService:
         self._tide_cache: dict[str, TideReading] = {}
         self._cache_time: Optional[datetime] = None
         self._cache_ttl = timedelta(minutes=6)  # NOAA updates every 6 minutes
+        self._refresh_lock = asyncio.Lock()
 
     def _is_cache_valid(self) -> bool:
         """Check if cached data is still valid."""
@@ -41,37 +58,34 @@ class TidesService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.settings.noaa_tides_base_url,
-                    params=params,
-                    timeout=10.0,
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                if "data" not in data or len(data["data"]) == 0:
-                    return None
-
-                reading = data["data"][0]
-                water_level = float(reading["v"])
-                timestamp_str = reading["t"]
-
-                # Parse NOAA timestamp format: "2026-01-23 14:30"
-                timestamp = datetime.strptime(
-                    timestamp_str, "%Y-%m-%d %H:%M"
-                ).replace(tzinfo=timezone.utc)
-
-                return TideReading(
-                    station_id=station_id,
-                    station_name=self.NOAA_STATIONS.get(station_id, station_id),
-                    water_level_ft=water_level,
-                    timestamp=timestamp,
-                    datum="MLLW",
-                )
+            client = get_http_client()
+            response = await client.get(
+                self.settings.noaa_tides_base_url,
+                params=params,
+                timeout=10.0,
+            )
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+
+            if "data" not in data or len(data["data"]) == 0:
+                return None
+
+            reading = data["data"][0]
+            water_level = float(reading["v"])
+            timestamp_str = reading["t"]
+
+            timestamp = _parse_noaa_timestamp(timestamp_str)
+
+            return TideReading(
+                station_id=station_id,
+                station_name=self.NOAA_STATIONS.get(station_id, station_id),
+                water_level_ft=water_level,
+                timestamp=timestamp,
+                datum="MLLW",
+            )
 
-        except Exception as e:
-            print(f"Error fetching NOAA tide data for {station_id}: {e}")
+        except Exception:
+            logger.exception("Error fetching NOAA tide data for %s", station_id)
             return None
 
     async def fetch_usgs_water_levels(self) -> list[dict]:
@@ -83,36 +97,36 @@ class TidesService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.settings.usgs_water_url,
-                    params=params,
-                    timeout=10.0,
-                )
-                response.raise_for_status()
-                data = response.json()
+            client = get_http_client()
+            response = await client.get(
+                self.settings.usgs_water_url,
+                params=params,
+                timeout=10.0,
+            )
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+
+            results = []
+            time_series = data.get("value", {}).get("timeSeries", [])
+
+            for ts in time_series:
+                site_code = ts.get("sourceInfo", {}).get("siteCode", [{}])[0].get("value")
+                site_name = ts.get("sourceInfo", {}).get("siteName", "Unknown")
+                values = ts.get("values", [{}])[0].get("value", [])
+
+                if values:
+                    latest = values[-1]
+                    results.append({
+                        "site_id": site_code,
+                        "site_name": site_name,
+                        "water_level_ft": float(latest.get("value", 0)),
+                        "timestamp": latest.get("dateTime"),
+                    })
+
+            return results
 
-                results = []
-                time_series = data.get("value", {}).get("timeSeries", [])
-
-                for ts in time_series:
-                    site_code = ts.get("sourceInfo", {}).get("siteCode", [{}])[0].get("value")
-                    site_name = ts.get("sourceInfo", {}).get("siteName", "Unknown")
-                    values = ts.get("values", [{}])[0].get("value", [])
-
-                    if values:
-                        latest = values[-1]
-                        results.append({
-                            "site_id": site_code,
-                            "site_name": site_name,
-                            "water_level_ft": float(latest.get("value", 0)),
-                            "timestamp": latest.get("dateTime"),
-                        })
-
-                return results
-
-        except Exception as e:
-            print(f"Error fetching USGS water data: {e}")
+        except Exception:
+            logger.exception("Error fetching USGS water data")
             return []
 
     async def get_all_tide_readings(
@@ -122,17 +136,21 @@ class TidesService:
         if not force_refresh and self._is_cache_valid():
             return list(self._tide_cache.values())
 
-        readings = []
+        async with self._refresh_lock:
+            # Another request may have refreshed the cache while we waited
+            if not force_refresh and self._is_cache_valid():
+                return list(self._tide_cache.values())
 
-        # Fetch from both NOAA stations
-        for station_id in self.NOAA_STATIONS.keys():
-            reading = await self.fetch_noaa_tide(station_id)
-            if reading:
-                readings.append(reading)
-                self._tide_cache[station_id] = reading
+            # Fetch from both NOAA stations concurrently
+            results = await asyncio.gather(
+                *(self.fetch_noaa_tide(station_id) for station_id in self.NOAA_STATIONS)
+            )
+            readings = [reading for reading in results if reading]
+            for reading in readings:
+                self._tide_cache[reading.station_id] = reading
 
-        self._cache_time = datetime.now(timezone.utc)
-        return readings
+            self._cache_time = datetime.now(timezone.utc)
+            return readings
 
     async def get_current_tide_level(self) -> Optional[float]:
         """Get the current tide level (average of available stations)."""
@@ -160,14 +178,14 @@ class TidesService:
         for station_id in self.NOAA_STATIONS.keys():
             params["station"] = station_id
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        self.settings.noaa_tides_base_url,
-                        params=params,
-                        timeout=10.0,
-                    )
-                    response.raise_for_status()
-                    data = response.json()
+                client = get_http_client()
+                response = await client.get(
+                    self.settings.noaa_tides_base_url,
+                    params=params,
+                    timeout=10.0,
+                )
+                response.raise_for_status()
+                data = orjson.loads(response.content)
 
                 data_points = data.get("data", [])
                 if not data_points:
@@ -177,9 +195,7 @@ class TidesService:
                 closest = None
                 closest_delta = None
                 for entry in data_points:
-                    ts = datetime.strptime(entry["t"], "%Y-%m-%d %H:%M").replace(
-                        tzinfo=timezone.utc
-                    )
+                    ts = _parse_noaa_timestamp(entry["t"])
                     delta = abs((ts - target_time).total_seconds())
                     if closest_delta is None or delta < closest_delta:
                         closest_delta = delta
@@ -187,8 +203,8 @@ class TidesService:
 
                 if closest:
                     readings.append(float(closest["v"]))
-            except Exception as e:
-                print(f"Error fetching NOAA tide data for {station_id}: {e}")
+            except Exception:
+                logger.exception("Error fetching NOAA tide data for %s", station_id)
                 continue
 
         if not readings:
@@ -198,21 +214,28 @@ class TidesService:
 
     async def get_battery_tide_level(self) -> Optional[float]:
         """Get tide level specifically from The Battery station."""
-        if self._is_cache_valid() and "8518750" in self._tide_cache:
-            return self._tide_cache["8518750"].water_level_ft
+        station_id = self.settings.noaa_battery_station
+        if station_id not in self.NOAA_STATIONS:
+            # Not part of the shared refresh, and kept out of the cache so it
+            # doesn't skew the averaged readings
+            reading = await self.fetch_noaa_tide(station_id)
+            return reading.water_level_ft if reading else None
+
+        if self._is_cache_valid() and station_id in self._tide_cache:
+            return self._tide_cache[station_id].water_level_ft
 
-        reading = await self.fetch_noaa_tide(self.settings.noaa_battery_station)
-        if reading:
-            self._tide_cache["8518750"] = reading
-            return reading.water_level_ft
+        # Refresh every station at once so the next full read is a cache hit
+        for reading in await self.get_all_tide_readings():
+            if reading.station_id == station_id:
+                return reading.water_level_ft
 
         return None
 
     async def is_available(self) -> bool:
         """Check if tide data is available."""
+        # Served from the shared tide cache while it is fresh
         try:
-            reading = await self.fetch_noaa_tide(self.settings.noaa_battery_station)
-            return reading is not None
+            return await self.get_battery_tide_level() is not None
         except Exception:
             return False
 
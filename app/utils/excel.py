@@ -1,19 +1,129 @@
+import asyncio
+import csv
 import io
+import logging
+import math
+import multiprocessing
+import os
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import Optional
+from operator import attrgetter
+from typing import IO, Iterator, Optional
 
-import pandas as pd
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
+import xlsxwriter
 
-from app.models import StationReport
+from app.models import RiskLevel, StationReport
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for Excel generation, created on first use. A report
+# takes tens of milliseconds, so a couple of workers is plenty.
+EXCEL_MAX_WORKERS = 2
+_excel_pool: Optional[ProcessPoolExecutor] = None
+
+# Report columns and their Excel widths, in sheet order; shared by the Excel and CSV reports
+COLUMNS = [
+    ("Date", 12),
+    ("Time", 10),
+    ("Time Zone", 12),
+    ("Station Line", 12),
+    ("Stop Name", 30),
+    ("Borough", 12),
+    ("CBD", 8),
+    ("Daytime Routes", 20),
+    ("Structure", 12),
+    ("GTFS Latitude", 14),
+    ("GTFS Longitude", 14),
+    ("Precip Rate (in/hr)", 18),
+    ("1hr Accumulation (in)", 22),
+    ("6hr Accumulation (in)", 22),
+    ("Tide Level (ft)", 15),
+    ("Central Park Daily (in)", 22),
+    ("Central Park Daily Date", 20),
+    ("JFK Daily (in)", 18),
+    ("JFK Daily Date", 18),
+    ("LaGuardia Daily (in)", 20),
+    ("LaGuardia Daily Date", 20),
+    ("Forecast 6hr (in)", 18),
+    ("Forecast 24hr (in)", 18),
+    ("Predicted Risk 6hr", 18),
+    ("Predicted Risk 24hr", 18),
+    ("Risk Level", 12),
+    ("Risk Reason", 35),
+    ("Source", 18),
+]
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+RISK_LEVEL_COL = COLUMN_NAMES.index("Risk Level")
+
+
+def _finite_or_none(value: Optional[float]) -> Optional[float]:
+    # NaN (e.g. a masked radar cell) and inf become empty cells; xlsxwriter's
+    # write_number() rejects them and csv.writer would print "nan"
+    return value if value is not None and math.isfinite(value) else None
+
+
+def _round_or_none(value: Optional[float], decimals: int = 3) -> Optional[float]:
+    # Built-in round() rather than np.round, which can differ on ties
+    value = _finite_or_none(value)
+    return None if value is None else round(value, decimals)
+
+
+# Station attributes copied into the report as they are
+_station_fields = attrgetter(
+    "line",
+    "station_name",
+    "borough",
+    "cbd",
+    "daytime_routes",
+    "structure",
+)
+
+
+def _report_prefix(report_date: str, generated_at: datetime) -> tuple[str, str, str]:
+    """Date, Time and Time Zone cells, the same for every row of a report."""
+    return (
+        report_date,
+        generated_at.strftime("%H:%M:%S"),
+        generated_at.tzname() if generated_at.tzinfo else "UTC",
+    )
+
+
+def _report_row(station: StationReport, prefix: tuple[str, str, str]) -> tuple:
+    """One report row for a station, in COLUMNS order; None is an empty cell."""
+    return (
+        *prefix,
+        *_station_fields(station),
+        _finite_or_none(station.latitude),
+        _finite_or_none(station.longitude),
+        _round_or_none(station.precip_rate_in_hr or 0.0),
+        _round_or_none(station.accum_1hr_in or 0.0),
+        _round_or_none(station.accum_6hr_in or 0.0),
+        _round_or_none(station.tide_level_ft or None, 2),
+        _round_or_none(station.central_park_daily_in),
+        station.central_park_daily_date,
+        _round_or_none(station.jfk_daily_in),
+        station.jfk_daily_date,
+        _round_or_none(station.lga_daily_in),
+        station.lga_daily_date,
+        _round_or_none(station.forecast_6hr_in),
+        _round_or_none(station.forecast_24hr_in),
+        station.predicted_risk_6hr.value if station.predicted_risk_6hr else None,
+        station.predicted_risk_24hr.value if station.predicted_risk_24hr else None,
+        station.risk_level.value,
+        station.risk_reason,
+        station.source,
+    )
 
 
 def generate_excel_report(
     stations: list[StationReport],
     report_date: str,
     generated_at: datetime,
-) -> io.BytesIO:
+    output: IO[bytes],
+) -> IO[bytes]:
     """
     Generate an Excel report for MTA flood risk data.
 
@@ -21,230 +131,169 @@ def generate_excel_report(
         stations: List of station reports
         report_date: Date of the report
         generated_at: Timestamp when report was generated
+        output: Seekable binary file to write to
 
     Returns:
-        BytesIO buffer containing the Excel file
+        The file containing the Excel report, positioned at the start
     """
-    # Convert to DataFrame
-    data = []
-    for station in stations:
-        data.append({
-            "Date": report_date,
-            "Time": generated_at.strftime("%H:%M:%S"),
-            "Time Zone": generated_at.tzname() if generated_at.tzinfo else "UTC",
-            "Station Line": station.line,
-            "Stop Name": station.station_name,
-            "Borough": station.borough,
-            "CBD": station.cbd,
-            "Daytime Routes": station.daytime_routes,
-            "Structure": station.structure,
-            "GTFS Latitude": station.latitude,
-            "GTFS Longitude": station.longitude,
-            "Precip Rate (in/hr)": round(station.precip_rate_in_hr or 0, 3),
-            "1hr Accumulation (in)": round(station.accum_1hr_in or 0, 3),
-            "6hr Accumulation (in)": round(station.accum_6hr_in or 0, 3),
-            "Tide Level (ft)": round(station.tide_level_ft, 2) if station.tide_level_ft else None,
-            "Central Park Daily (in)": round(station.central_park_daily_in, 3)
-            if station.central_park_daily_in is not None
-            else None,
-            "Central Park Daily Date": station.central_park_daily_date,
-            "JFK Daily (in)": round(station.jfk_daily_in, 3)
-            if station.jfk_daily_in is not None
-            else None,
-            "JFK Daily Date": station.jfk_daily_date,
-            "LaGuardia Daily (in)": round(station.lga_daily_in, 3)
-            if station.lga_daily_in is not None
-            else None,
-            "LaGuardia Daily Date": station.lga_daily_date,
-            "Forecast 6hr (in)": round(station.forecast_6hr_in, 3)
-            if station.forecast_6hr_in is not None
-            else None,
-            "Forecast 24hr (in)": round(station.forecast_24hr_in, 3)
-            if station.forecast_24hr_in is not None
-            else None,
-            "Predicted Risk 6hr": station.predicted_risk_6hr.value
-            if station.predicted_risk_6hr
-            else None,
-            "Predicted Risk 24hr": station.predicted_risk_24hr.value
-            if station.predicted_risk_24hr
-            else None,
-            "Risk Level": station.risk_level.value,
-            "Risk Reason": station.risk_reason or "",
-            "Source": station.source,
-        })
-
-    df = pd.DataFrame(data)
-
-    # Create Excel workbook
-    output = io.BytesIO()
-
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name="Flood Risk Report", index=False)
-        workbook = writer.book
-        worksheet = writer.sheets["Flood Risk Report"]
-
-        # Style the header row
-        header_fill = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
-        header_font = Font(color="FFFFFF", bold=True)
-        thin_border = Border(
-            left=Side(style="thin"),
-            right=Side(style="thin"),
-            top=Side(style="thin"),
-            bottom=Side(style="thin"),
-        )
+    # Create Excel workbook. constant_memory flushes each row to a temp file
+    # as soon as the next one starts, so rows must be written top to bottom.
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True, "strings_to_urls": False})
+    worksheet = workbook.add_worksheet("Flood Risk Report")
+
+    # Formats are created once and shared by every cell that uses them
+    border_and_center = {"border": 1, "align": "center", "valign": "vcenter"}
+    header_format = workbook.add_format(
+        {**border_and_center, "bg_color": "#1F4E79", "font_color": "#FFFFFF", "bold": True}
+    )
+    data_format = workbook.add_format(border_and_center)
+
+    # Risk level colors
+    risk_formats = {
+        RiskLevel.HIGH.value: workbook.add_format(
+            {**border_and_center, "bg_color": "#FF0000", "font_color": "#FFFFFF", "bold": True}
+        ),
+        RiskLevel.AT_RISK.value: workbook.add_format({**border_and_center, "bg_color": "#FFA500"}),
+        RiskLevel.LOW.value: workbook.add_format({**border_and_center, "bg_color": "#00FF00"}),
+    }
+
+    # Column widths
+    for col_idx, (_, width) in enumerate(COLUMNS):
+        worksheet.set_column(col_idx, col_idx, width)
+
+    # Freeze the header row
+    worksheet.freeze_panes(1, 0)
+
+    # Header row
+    worksheet.write_row(0, 0, COLUMN_NAMES, header_format)
+
+    # Data rows are written straight from the reports in one pass per row,
+    # with the risk level cell written in its color rather than overwritten
+    prefix = _report_prefix(report_date, generated_at)
+    risk_counts = Counter()
+    for row_idx, station in enumerate(stations, start=1):
+        values = _report_row(station, prefix)
+        risk_value = values[RISK_LEVEL_COL]
+        risk_counts[risk_value] += 1
+        worksheet.write_row(row_idx, 0, values[:RISK_LEVEL_COL], data_format)
+        worksheet.write(row_idx, RISK_LEVEL_COL, risk_value, risk_formats.get(risk_value, data_format))
+        worksheet.write_row(row_idx, RISK_LEVEL_COL + 1, values[RISK_LEVEL_COL + 1:], data_format)
+
+    # Add summary sheet
+    summary_ws = workbook.add_worksheet("Summary")
+    high_count = risk_counts[RiskLevel.HIGH.value]
+    at_risk_count = risk_counts[RiskLevel.AT_RISK.value]
+    low_count = risk_counts[RiskLevel.LOW.value]
+
+    summary_data = [
+        ["MTA Flood Risk Report Summary"],
+        [""],
+        ["Report Date:", report_date],
+        ["Generated At:", generated_at.strftime("%Y-%m-%d %H:%M:%S UTC")],
+        [""],
+        ["Total Stations:", len(stations)],
+        ["HIGH Risk:", high_count],
+        ["AT RISK:", at_risk_count],
+        ["LOW Risk:", low_count],
+        [""],
+        ["Data Source:", "NOAA MRMS"],
+    ]
+
+    title_format = workbook.add_format({"bold": True, "font_size": 14})
+    label_format = workbook.add_format({"bold": True})
+    summary_ws.set_column(0, 0, 20)
+    summary_ws.set_column(1, 1, 30)
 
-        for cell in worksheet[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.border = thin_border
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-
-        # Risk level colors
-        risk_colors = {
-            "FLOOD WARNING": PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid"),
-            "FLOOD WATCH": PatternFill(start_color="FFA500", end_color="FFA500", fill_type="solid"),
-            "CLEAR": PatternFill(start_color="00FF00", end_color="00FF00", fill_type="solid"),
-        }
-
-        # Style data rows
-        for row_idx, row in enumerate(worksheet.iter_rows(min_row=2, max_row=len(df) + 1), start=2):
-            for cell in row:
-                cell.border = thin_border
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-
-        # Color the risk level cell (column Z = 26th column)
-            risk_cell = worksheet.cell(row=row_idx, column=26)
-            risk_value = risk_cell.value
-            if risk_value in risk_colors:
-                risk_cell.fill = risk_colors[risk_value]
-                if risk_value == "FLOOD WARNING":
-                    risk_cell.font = Font(color="FFFFFF", bold=True)
-
-        # Auto-adjust column widths
-        column_widths = {
-            "A": 12,  # Date
-            "B": 10,  # Time
-            "C": 12,  # Time Zone
-            "D": 12,  # Station Line
-            "E": 30,  # Stop Name
-            "F": 12,  # Borough
-            "G": 8,   # CBD
-            "H": 20,  # Daytime Routes
-            "I": 12,  # Structure
-            "J": 14,  # GTFS Latitude
-            "K": 14,  # GTFS Longitude
-            "L": 18,  # Precip Rate
-            "M": 22,  # 1hr Accumulation
-            "N": 22,  # 6hr Accumulation
-            "O": 15,  # Tide Level
-            "P": 22,  # Central Park Daily
-            "Q": 20,  # Central Park Daily Date
-            "R": 18,  # JFK Daily
-            "S": 18,  # JFK Daily Date
-            "T": 20,  # LaGuardia Daily
-            "U": 20,  # LaGuardia Daily Date
-            "V": 18,  # Forecast 6hr
-            "W": 18,  # Forecast 24hr
-            "X": 18,  # Predicted Risk 6hr
-            "Y": 18,  # Predicted Risk 24hr
-            "Z": 12,  # Risk Level
-            "AA": 35,  # Risk Reason
-            "AB": 18,  # Source
-        }
-
-        for col, width in column_widths.items():
-            worksheet.column_dimensions[col].width = width
-
-        # Freeze the header row
-        worksheet.freeze_panes = "A2"
-
-        # Add summary sheet
-        summary_ws = workbook.create_sheet("Summary")
-        high_count = sum(1 for s in stations if s.risk_level.value == "FLOOD WARNING")
-        at_risk_count = sum(1 for s in stations if s.risk_level.value == "FLOOD WATCH")
-        low_count = sum(1 for s in stations if s.risk_level.value == "CLEAR")
-
-        summary_data = [
-            ["MTA Flood Risk Report Summary"],
-            [""],
-            ["Report Date:", report_date],
-            ["Generated At:", generated_at.strftime("%Y-%m-%d %H:%M:%S UTC")],
-            [""],
-            ["Total Stations:", len(stations)],
-            ["HIGH Risk:", high_count],
-            ["AT RISK:", at_risk_count],
-            ["LOW Risk:", low_count],
-            [""],
-            ["Data Source:", "NOAA MRMS"],
-        ]
-
-        for row_idx, row_data in enumerate(summary_data, start=1):
-            for col_idx, value in enumerate(row_data, start=1):
-                cell = summary_ws.cell(row=row_idx, column=col_idx, value=value)
-                if row_idx == 1:
-                    cell.font = Font(bold=True, size=14)
-                elif col_idx == 1 and row_idx > 2:
-                    cell.font = Font(bold=True)
-
-        summary_ws.column_dimensions["A"].width = 20
-        summary_ws.column_dimensions["B"].width = 30
+    for row_idx, row_data in enumerate(summary_data):
+        for col_idx, value in enumerate(row_data):
+            cell_format = None
+            if row_idx == 0:
+                cell_format = title_format
+            elif col_idx == 0 and row_idx > 1:
+                cell_format = label_format
+            summary_ws.write(row_idx, col_idx, value, cell_format)
 
+    workbook.close()
     output.seek(0)
     return output
 
 
-def generate_csv_report(
+def _write_excel_file(stations: list[StationReport], report_date: str, generated_at: datetime) -> str:
+    """Worker process entry point: write the report to a temp file and return its path."""
+    with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as output:
+        try:
+            generate_excel_report(stations, report_date, generated_at, output)
+        except Exception:
+            output.close()
+            os.remove(output.name)
+            raise
+    return output.name
+
+
+def _get_excel_pool() -> ProcessPoolExecutor:
+    global _excel_pool
+    if _excel_pool is None:
+        # spawn, not fork: the server process has an event loop and threads running
+        _excel_pool = ProcessPoolExecutor(
+            max_workers=min(EXCEL_MAX_WORKERS, os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _excel_pool
+
+
+async def generate_excel_report_file(
     stations: list[StationReport],
     report_date: str,
     generated_at: datetime,
 ) -> str:
-    """Generate a CSV report string."""
-    data = []
-    for station in stations:
-        data.append({
-            "Date": report_date,
-            "Time": generated_at.strftime("%H:%M:%S"),
-            "Time Zone": generated_at.tzname() if generated_at.tzinfo else "UTC",
-            "Station Line": station.line,
-            "Stop Name": station.station_name,
-            "Borough": station.borough,
-            "CBD": station.cbd,
-            "Daytime Routes": station.daytime_routes,
-            "Structure": station.structure,
-            "GTFS Latitude": station.latitude,
-            "GTFS Longitude": station.longitude,
-            "Precip Rate (in/hr)": round(station.precip_rate_in_hr or 0, 3),
-            "1hr Accumulation (in)": round(station.accum_1hr_in or 0, 3),
-            "6hr Accumulation (in)": round(station.accum_6hr_in or 0, 3),
-            "Tide Level (ft)": round(station.tide_level_ft, 2) if station.tide_level_ft else "",
-            "Central Park Daily (in)": round(station.central_park_daily_in, 3)
-            if station.central_park_daily_in is not None
-            else "",
-            "Central Park Daily Date": station.central_park_daily_date or "",
-            "JFK Daily (in)": round(station.jfk_daily_in, 3)
-            if station.jfk_daily_in is not None
-            else "",
-            "JFK Daily Date": station.jfk_daily_date or "",
-            "LaGuardia Daily (in)": round(station.lga_daily_in, 3)
-            if station.lga_daily_in is not None
-            else "",
-            "LaGuardia Daily Date": station.lga_daily_date or "",
-            "Forecast 6hr (in)": round(station.forecast_6hr_in, 3)
-            if station.forecast_6hr_in is not None
-            else "",
-            "Forecast 24hr (in)": round(station.forecast_24hr_in, 3)
-            if station.forecast_24hr_in is not None
-            else "",
-            "Predicted Risk 6hr": station.predicted_risk_6hr.value
-            if station.predicted_risk_6hr
-            else "",
-            "Predicted Risk 24hr": station.predicted_risk_24hr.value
-            if station.predicted_risk_24hr
-            else "",
-            "Risk Level": station.risk_level.value,
-            "Risk Reason": station.risk_reason or "",
-            "Source": station.source,
-        })
-
-    df = pd.DataFrame(data)
-    return df.to_csv(index=False)
+    """
+    Generate the Excel report in a worker process without blocking the event loop.
+
+    Returns:
+        Path of a temporary .xlsx file, which the caller must delete
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_excel_pool()
+    try:
+        return await loop.run_in_executor(pool, _write_excel_file, stations, report_date, generated_at)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed) and the executor can't be reused.
+        # Replace it, unless a concurrent request already has, and retry once.
+        logger.warning("Excel worker pool broke; starting a new one")
+        if _excel_pool is pool:
+            shutdown_excel_pool(wait=False)
+        return await loop.run_in_executor(_get_excel_pool(), _write_excel_file, stations, report_date, generated_at)
+
+
+def shutdown_excel_pool(wait: bool = True) -> None:
+    """Stop the Excel worker processes, if any were started."""
+    global _excel_pool
+    if _excel_pool is not None:
+        _excel_pool.shutdown(wait=wait, cancel_futures=True)
+        _excel_pool = None
+
+
+def generate_csv_report(
+    stations: list[StationReport],
+    report_date: str,
+    generated_at: datetime,
+    chunk_rows: int = 256,
+) -> Iterator[str]:
+    """Generate a CSV report, yielding it in chunks of rows for streaming."""
+    prefix = _report_prefix(report_date, generated_at)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(COLUMN_NAMES)
+
+    for start in range(0, len(stations), chunk_rows):
+        writer.writerows(
+            _report_row(station, prefix)
+            for station in stations[start:start + chunk_rows]
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
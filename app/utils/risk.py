@@ -1,8 +1,87 @@
-from typing import Optional
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
 
 from app.config import get_settings
 from app.models import RiskLevel
 
+# int8 codes returned by calculate_risk_batch, indexing RISK_LEVELS
+HIGH_CODE, AT_RISK_CODE, LOW_CODE = np.int8(0), np.int8(1), np.int8(2)
+_NO_LEVEL_CODE = np.int8(3)
+RISK_LEVELS = (RiskLevel.HIGH, RiskLevel.AT_RISK, RiskLevel.LOW)
+
+# (high precip rate, high 6hr accumulation, at-risk precip rate, at-risk 6hr accumulation)
+Thresholds = tuple[float, float, float, float]
+
+
+@lru_cache(maxsize=1)
+def _risk_thresholds() -> dict[str, Thresholds]:
+    """Rate/accumulation thresholds per structure rule, read from settings once."""
+    settings = get_settings()
+    return {
+        "subway": (
+            settings.subway_high_precip_rate,
+            settings.subway_high_accum_6hr,
+            settings.subway_atrisk_precip_rate,
+            settings.subway_atrisk_accum_6hr,
+        ),
+        "open cut": (
+            settings.opencut_high_precip_rate,
+            settings.opencut_high_accum_6hr,
+            settings.opencut_atrisk_precip_rate,
+            settings.opencut_atrisk_accum_6hr,
+        ),
+        "default": (
+            settings.default_high_precip_rate,
+            settings.default_high_accum_6hr,
+            settings.default_atrisk_precip_rate,
+            settings.default_atrisk_accum_6hr,
+        ),
+    }
+
+
+class _StructureKind(NamedTuple):
+    """Which structure rules apply to a station; more than one can match."""
+
+    subway: bool
+    open_cut: bool
+    elevated: bool
+
+
+@lru_cache(maxsize=64)
+def _classify(structure: Optional[str]) -> _StructureKind:
+    """Classify a structure string once; stations share a handful of distinct values."""
+    structure_lower = structure.lower() if structure else ""
+    return _StructureKind(
+        subway="subway" in structure_lower,
+        open_cut="open cut" in structure_lower,
+        elevated="elevated" in structure_lower,
+    )
+
+
+@lru_cache(maxsize=1)
+def _tide_elevated_thresholds() -> tuple[float, float, float, float]:
+    """(high tide level, coastal high rate, coastal at-risk rate, elevated at-risk rate)."""
+    settings = get_settings()
+    return (
+        settings.tide_high_level,
+        settings.coastal_high_precip_rate,
+        settings.coastal_atrisk_precip_rate,
+        settings.elevated_atrisk_precip_rate,
+    )
+
+
+def _threshold_level(precip_rate: float, accum_6hr: float, thresholds: Thresholds) -> Optional[RiskLevel]:
+    """HIGH or AT_RISK if either value exceeds its threshold, else None."""
+    high_rate, high_accum, atrisk_rate, atrisk_accum = thresholds
+    if precip_rate > high_rate or accum_6hr > high_accum:
+        return RiskLevel.HIGH
+    if precip_rate > atrisk_rate or accum_6hr > atrisk_accum:
+        return RiskLevel.AT_RISK
+    return None
+
 
 def calculate_risk(
     structure: str,
@@ -25,50 +104,141 @@ def calculate_risk(
     Returns:
         RiskLevel enum value (HIGH, AT RISK, or LOW)
     """
-    settings = get_settings()
-    structure_lower = structure.lower() if structure else ""
+    thresholds = _risk_thresholds()
+    tide_high_level, coastal_high_rate, coastal_atrisk_rate, elevated_atrisk_rate = _tide_elevated_thresholds()
+    kind = _classify(structure)
 
     # Handle missing values
     precip_rate = precip_rate_in_hr or 0.0
     accum_6hr = accum_6hr_in or 0.0
 
     # Underground stations (most vulnerable)
-    if "subway" in structure_lower:
-        if precip_rate > settings.subway_high_precip_rate or accum_6hr > settings.subway_high_accum_6hr:
-            return RiskLevel.HIGH
-        if precip_rate > settings.subway_atrisk_precip_rate or accum_6hr > settings.subway_atrisk_accum_6hr:
-            return RiskLevel.AT_RISK
+    if kind.subway:
+        level = _threshold_level(precip_rate, accum_6hr, thresholds["subway"])
+        if level is not None:
+            return level
 
     # Open cut stations
-    if "open cut" in structure_lower:
-        if precip_rate > settings.opencut_high_precip_rate or accum_6hr > settings.opencut_high_accum_6hr:
-            return RiskLevel.HIGH
-        if precip_rate > settings.opencut_atrisk_precip_rate or accum_6hr > settings.opencut_atrisk_accum_6hr:
-            return RiskLevel.AT_RISK
+    if kind.open_cut:
+        level = _threshold_level(precip_rate, accum_6hr, thresholds["open cut"])
+        if level is not None:
+            return level
 
     # Coastal flooding factor
     if is_coastal and tide_level_ft is not None:
-        if tide_level_ft > settings.tide_high_level:
-            if precip_rate > settings.coastal_high_precip_rate:
+        if tide_level_ft > tide_high_level:
+            if precip_rate > coastal_high_rate:
                 return RiskLevel.HIGH
-            if precip_rate > settings.coastal_atrisk_precip_rate:
+            if precip_rate > coastal_atrisk_rate:
                 return RiskLevel.AT_RISK
 
     # Elevated stations (safest from flooding)
-    if "elevated" in structure_lower:
-        if precip_rate > settings.elevated_atrisk_precip_rate:
+    if kind.elevated:
+        if precip_rate > elevated_atrisk_rate:
             return RiskLevel.AT_RISK
         return RiskLevel.LOW
 
     # At-grade or other structures - use default thresholds
-    if precip_rate > settings.default_high_precip_rate or accum_6hr > settings.default_high_accum_6hr:
-        return RiskLevel.HIGH
-    if precip_rate > settings.default_atrisk_precip_rate or accum_6hr > settings.default_atrisk_accum_6hr:
-        return RiskLevel.AT_RISK
+    return _threshold_level(precip_rate, accum_6hr, thresholds["default"]) or RiskLevel.LOW
+
+
+def _structure_flags(structure_arr: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Subway / open cut / elevated masks for an array of structure strings.
+
+    Structures are encoded as categorical codes so each distinct structure
+    (a handful) is classified once rather than once per station.
+    """
+    categorical = pd.Categorical(structure_arr)
+    # One row per category plus a trailing all-False row, selected by code -1 (missing)
+    kinds = np.array([_classify(str(c)) for c in categorical.categories] + [(False, False, False)], dtype=bool)
+    flags = kinds[categorical.codes]
+    return flags[:, 0], flags[:, 1], flags[:, 2]
+
+
+def _threshold_codes(precip_rate: np.ndarray, accum_6hr: np.ndarray, thresholds: Thresholds) -> np.ndarray:
+    """Array form of _threshold_level, with _NO_LEVEL_CODE where nothing is exceeded."""
+    high_rate, high_accum, atrisk_rate, atrisk_accum = thresholds
+    return np.where(
+        (precip_rate > high_rate) | (accum_6hr > high_accum),
+        HIGH_CODE,
+        np.where((precip_rate > atrisk_rate) | (accum_6hr > atrisk_accum), AT_RISK_CODE, _NO_LEVEL_CODE),
+    )
+
+
+def calculate_risk_batch(
+    structure_arr: np.ndarray,
+    precip_rate_arr: np.ndarray,
+    accum6_arr: np.ndarray,
+    tide_arr: np.ndarray,
+    is_coastal_arr: np.ndarray,
+) -> np.ndarray:
+    """
+    calculate_risk over arrays of stations, as int8 codes into RISK_LEVELS.
+
+    The rules are applied from lowest to highest precedence, each one
+    overwriting the stations it decides, so the result matches the scalar
+    cascade. Missing precipitation values are treated as 0 and missing tide
+    levels as NaN.
+
+    Returns:
+        int8 array of HIGH_CODE, AT_RISK_CODE or LOW_CODE per station
+    """
+    thresholds = _risk_thresholds()
+    tide_high_level, coastal_high_rate, coastal_atrisk_rate, elevated_atrisk_rate = _tide_elevated_thresholds()
+    is_subway, is_open_cut, is_elevated = _structure_flags(structure_arr)
 
-    return RiskLevel.LOW
+    precip_rate = np.nan_to_num(np.asarray(precip_rate_arr, dtype=float), nan=0.0)
+    accum_6hr = np.nan_to_num(np.asarray(accum6_arr, dtype=float), nan=0.0)
+    tide = np.asarray(tide_arr, dtype=float)
+    # NaN tide compares False, matching the scalar "tide_level_ft is not None" guard
+    high_tide = np.asarray(is_coastal_arr, dtype=bool) & (tide > tide_high_level)
 
+    # Default thresholds, LOW when none is exceeded
+    codes = _threshold_codes(precip_rate, accum_6hr, thresholds["default"])
+    codes[codes == _NO_LEVEL_CODE] = LOW_CODE
 
+    # Elevated stations
+    elevated_codes = np.where(precip_rate > elevated_atrisk_rate, AT_RISK_CODE, LOW_CODE)
+    codes = np.where(is_elevated, elevated_codes, codes)
+
+    # Coastal flooding factor
+    coastal_codes = np.where(precip_rate > coastal_high_rate, HIGH_CODE, AT_RISK_CODE)
+    codes = np.where(high_tide & (precip_rate > coastal_atrisk_rate), coastal_codes, codes)
+
+    # Open cut, then subway stations, which only decide when a threshold is exceeded
+    for flag, key in ((is_open_cut, "open cut"), (is_subway, "subway")):
+        structure_codes = _threshold_codes(precip_rate, accum_6hr, thresholds[key])
+        codes = np.where(flag & (structure_codes != _NO_LEVEL_CODE), structure_codes, codes)
+
+    return codes
+
+
+# Reason templates, bound once rather than spelled out in every branch
+_RATE_REASON = "{}: precip rate {:.3f} > {:.3f} in/hr".format
+_ACCUM_REASON = "{}: 6hr accumulation {:.3f} > {:.3f} in".format
+_COASTAL_REASON = "Coastal: tide {:.2f}ft > {:.2f}ft and precip rate {:.3f} > {:.3f} in/hr".format
+_ELEVATED_REASON = "Elevated: precip rate {:.3f} {} {:.3f} in/hr".format
+_BELOW_REASON = "Below thresholds: rate {:.3f} in/hr, 6hr {:.3f} in".format
+
+
+def _threshold_reason(
+    label: str, precip_rate: float, accum_6hr: float, thresholds: Thresholds
+) -> Optional[tuple[RiskLevel, str]]:
+    """_threshold_level plus the comparison that decided it, or None."""
+    high_rate, high_accum, atrisk_rate, atrisk_accum = thresholds
+    if precip_rate > high_rate:
+        return RiskLevel.HIGH, _RATE_REASON(label, precip_rate, high_rate)
+    if accum_6hr > high_accum:
+        return RiskLevel.HIGH, _ACCUM_REASON(label, accum_6hr, high_accum)
+    if precip_rate > atrisk_rate:
+        return RiskLevel.AT_RISK, _RATE_REASON(label, precip_rate, atrisk_rate)
+    if accum_6hr > atrisk_accum:
+        return RiskLevel.AT_RISK, _ACCUM_REASON(label, accum_6hr, atrisk_accum)
+    return None
+
+
+@lru_cache(maxsize=4096)
 def calculate_risk_with_reason(
     structure: str,
     precip_rate_in_hr: float,
@@ -78,115 +248,58 @@ def calculate_risk_with_reason(
 ) -> tuple[RiskLevel, str]:
     """
     Calculate flood risk level and return a short reason string.
+
+    Results are cached: stations share structures and the gridded
+    precipitation values repeat, so most calls skip formatting entirely.
     """
-    settings = get_settings()
-    structure_lower = structure.lower() if structure else ""
+    thresholds = _risk_thresholds()
+    tide_high_level, coastal_high_rate, coastal_atrisk_rate, elevated_atrisk_rate = _tide_elevated_thresholds()
+    kind = _classify(structure)
 
     precip_rate = precip_rate_in_hr or 0.0
     accum_6hr = accum_6hr_in or 0.0
 
-    if "subway" in structure_lower:
-        if precip_rate > settings.subway_high_precip_rate:
-            return (
-                RiskLevel.HIGH,
-                f"Subway: precip rate {precip_rate:.3f} > {settings.subway_high_precip_rate:.3f} in/hr",
-            )
-        if accum_6hr > settings.subway_high_accum_6hr:
-            return (
-                RiskLevel.HIGH,
-                f"Subway: 6hr accumulation {accum_6hr:.3f} > {settings.subway_high_accum_6hr:.3f} in",
-            )
-        if precip_rate > settings.subway_atrisk_precip_rate:
-            return (
-                RiskLevel.AT_RISK,
-                f"Subway: precip rate {precip_rate:.3f} > {settings.subway_atrisk_precip_rate:.3f} in/hr",
-            )
-        if accum_6hr > settings.subway_atrisk_accum_6hr:
-            return (
-                RiskLevel.AT_RISK,
-                f"Subway: 6hr accumulation {accum_6hr:.3f} > {settings.subway_atrisk_accum_6hr:.3f} in",
-            )
+    if kind.subway:
+        result = _threshold_reason("Subway", precip_rate, accum_6hr, thresholds["subway"])
+        if result is not None:
+            return result
 
-    if "open cut" in structure_lower:
-        if precip_rate > settings.opencut_high_precip_rate:
-            return (
-                RiskLevel.HIGH,
-                f"Open Cut: precip rate {precip_rate:.3f} > {settings.opencut_high_precip_rate:.3f} in/hr",
-            )
-        if accum_6hr > settings.opencut_high_accum_6hr:
-            return (
-                RiskLevel.HIGH,
-                f"Open Cut: 6hr accumulation {accum_6hr:.3f} > {settings.opencut_high_accum_6hr:.3f} in",
-            )
-        if precip_rate > settings.opencut_atrisk_precip_rate:
-            return (
-                RiskLevel.AT_RISK,
-                f"Open Cut: precip rate {precip_rate:.3f} > {settings.opencut_atrisk_precip_rate:.3f} in/hr",
-            )
-        if accum_6hr > settings.opencut_atrisk_accum_6hr:
-            return (
-                RiskLevel.AT_RISK,
-                f"Open Cut: 6hr accumulation {accum_6hr:.3f} > {settings.opencut_atrisk_accum_6hr:.3f} in",
-            )
+    if kind.open_cut:
+        result = _threshold_reason("Open Cut", precip_rate, accum_6hr, thresholds["open cut"])
+        if result is not None:
+            return result
 
-    if is_coastal and tide_level_ft is not None and tide_level_ft > settings.tide_high_level:
-        if precip_rate > settings.coastal_high_precip_rate:
-            return (
-                RiskLevel.HIGH,
-                f"Coastal: tide {tide_level_ft:.2f}ft > {settings.tide_high_level:.2f}ft and precip rate {precip_rate:.3f} > {settings.coastal_high_precip_rate:.3f} in/hr",
+    if is_coastal and tide_level_ft is not None and tide_level_ft > tide_high_level:
+        if precip_rate > coastal_high_rate:
+            return RiskLevel.HIGH, _COASTAL_REASON(
+                tide_level_ft, tide_high_level, precip_rate, coastal_high_rate
             )
-        if precip_rate > settings.coastal_atrisk_precip_rate:
-            return (
-                RiskLevel.AT_RISK,
-                f"Coastal: tide {tide_level_ft:.2f}ft > {settings.tide_high_level:.2f}ft and precip rate {precip_rate:.3f} > {settings.coastal_atrisk_precip_rate:.3f} in/hr",
+        if precip_rate > coastal_atrisk_rate:
+            return RiskLevel.AT_RISK, _COASTAL_REASON(
+                tide_level_ft, tide_high_level, precip_rate, coastal_atrisk_rate
             )
 
-    if "elevated" in structure_lower:
-        if precip_rate > settings.elevated_atrisk_precip_rate:
-            return (
-                RiskLevel.AT_RISK,
-                f"Elevated: precip rate {precip_rate:.3f} > {settings.elevated_atrisk_precip_rate:.3f} in/hr",
-            )
-        return RiskLevel.LOW, f"Elevated: precip rate {precip_rate:.3f} <= {settings.elevated_atrisk_precip_rate:.3f} in/hr"
-
-    if precip_rate > settings.default_high_precip_rate:
-        return (
-            RiskLevel.HIGH,
-            f"Default: precip rate {precip_rate:.3f} > {settings.default_high_precip_rate:.3f} in/hr",
-        )
-    if accum_6hr > settings.default_high_accum_6hr:
-        return (
-            RiskLevel.HIGH,
-            f"Default: 6hr accumulation {accum_6hr:.3f} > {settings.default_high_accum_6hr:.3f} in",
-        )
-    if precip_rate > settings.default_atrisk_precip_rate:
-        return (
-            RiskLevel.AT_RISK,
-            f"Default: precip rate {precip_rate:.3f} > {settings.default_atrisk_precip_rate:.3f} in/hr",
-        )
-    if accum_6hr > settings.default_atrisk_accum_6hr:
-        return (
-            RiskLevel.AT_RISK,
-            f"Default: 6hr accumulation {accum_6hr:.3f} > {settings.default_atrisk_accum_6hr:.3f} in",
-        )
+    if kind.elevated:
+        if precip_rate > elevated_atrisk_rate:
+            return RiskLevel.AT_RISK, _ELEVATED_REASON(precip_rate, ">", elevated_atrisk_rate)
+        return RiskLevel.LOW, _ELEVATED_REASON(precip_rate, "<=", elevated_atrisk_rate)
 
-    return (
-        RiskLevel.LOW,
-        f"Below thresholds: rate {precip_rate:.3f} in/hr, 6hr {accum_6hr:.3f} in",
-    )
+    result = _threshold_reason("Default", precip_rate, accum_6hr, thresholds["default"])
+    if result is not None:
+        return result
 
+    return RiskLevel.LOW, _BELOW_REASON(precip_rate, accum_6hr)
 
-def get_risk_summary(risk_levels: list[RiskLevel]) -> dict:
-    """Get summary counts of risk levels."""
-    high_count = sum(1 for r in risk_levels if r == RiskLevel.HIGH)
-    at_risk_count = sum(1 for r in risk_levels if r == RiskLevel.AT_RISK)
-    low_count = sum(1 for r in risk_levels if r == RiskLevel.LOW)
+
+def get_risk_code_summary(codes: np.ndarray) -> dict:
+    """Summary counts of the int8 codes from calculate_risk_batch, in one bincount."""
+    high_count, at_risk_count, low_count = np.bincount(codes, minlength=3)[[HIGH_CODE, AT_RISK_CODE, LOW_CODE]]
 
     return {
-        "high_risk_count": high_count,
-        "at_risk_count": at_risk_count,
-        "low_count": low_count,
-        "total": len(risk_levels),
+        "high_risk_count": int(high_count),
+        "at_risk_count": int(at_risk_count),
+        "low_count": int(low_count),
+        "total": len(codes),
     }
 
 
@@ -206,50 +319,41 @@ def calculate_predicted_risk(
     if window_hours <= 0:
         return RiskLevel.LOW
 
-    settings = get_settings()
-    structure_lower = structure.lower() if structure else ""
+    thresholds = _risk_thresholds()
+    tide_high_level, coastal_high_rate, coastal_atrisk_rate, elevated_atrisk_rate = _tide_elevated_thresholds()
+    kind = _classify(structure)
     avg_rate = forecast_total_in / float(window_hours)
     accum_factor = window_hours / 6.0
 
-    subway_high_accum = settings.subway_high_accum_6hr * accum_factor
-    subway_atrisk_accum = settings.subway_atrisk_accum_6hr * accum_factor
-    opencut_high_accum = settings.opencut_high_accum_6hr * accum_factor
-    opencut_atrisk_accum = settings.opencut_atrisk_accum_6hr * accum_factor
-    default_high_accum = settings.default_high_accum_6hr * accum_factor
-    default_atrisk_accum = settings.default_atrisk_accum_6hr * accum_factor
+    def scaled(key: str) -> Thresholds:
+        high_rate, high_accum, atrisk_rate, atrisk_accum = thresholds[key]
+        return high_rate, high_accum * accum_factor, atrisk_rate, atrisk_accum * accum_factor
 
     # Underground stations
-    if "subway" in structure_lower:
-        if avg_rate > settings.subway_high_precip_rate or forecast_total_in > subway_high_accum:
-            return RiskLevel.HIGH
-        if avg_rate > settings.subway_atrisk_precip_rate or forecast_total_in > subway_atrisk_accum:
-            return RiskLevel.AT_RISK
+    if kind.subway:
+        level = _threshold_level(avg_rate, forecast_total_in, scaled("subway"))
+        if level is not None:
+            return level
 
     # Open cut stations
-    if "open cut" in structure_lower:
-        if avg_rate > settings.opencut_high_precip_rate or forecast_total_in > opencut_high_accum:
-            return RiskLevel.HIGH
-        if avg_rate > settings.opencut_atrisk_precip_rate or forecast_total_in > opencut_atrisk_accum:
-            return RiskLevel.AT_RISK
+    if kind.open_cut:
+        level = _threshold_level(avg_rate, forecast_total_in, scaled("open cut"))
+        if level is not None:
+            return level
 
     # Coastal flooding factor
     if is_coastal and tide_level_ft is not None:
-        if tide_level_ft > settings.tide_high_level:
-            if avg_rate > settings.coastal_high_precip_rate:
+        if tide_level_ft > tide_high_level:
+            if avg_rate > coastal_high_rate:
                 return RiskLevel.HIGH
-            if avg_rate > settings.coastal_atrisk_precip_rate:
+            if avg_rate > coastal_atrisk_rate:
                 return RiskLevel.AT_RISK
 
     # Elevated stations
-    if "elevated" in structure_lower:
-        if avg_rate > settings.elevated_atrisk_precip_rate:
+    if kind.elevated:
+        if avg_rate > elevated_atrisk_rate:
             return RiskLevel.AT_RISK
         return RiskLevel.LOW
 
     # Default thresholds
-    if avg_rate > settings.default_high_precip_rate or forecast_total_in > default_high_accum:
-        return RiskLevel.HIGH
-    if avg_rate > settings.default_atrisk_precip_rate or forecast_total_in > default_atrisk_accum:
-        return RiskLevel.AT_RISK
-
-    return RiskLevel.LOW
+    return _threshold_level(avg_rate, forecast_total_in, scaled("default")) or RiskLevel.LOW
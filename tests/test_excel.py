@@ -0,0 +1,52 @@
+import csv
+import io
+from datetime import datetime, timezone
+
+from openpyxl import load_workbook
+
+from app.models import RiskLevel, StationReport
+from app.utils.excel import COLUMN_NAMES, generate_csv_report, generate_excel_report
+
+GENERATED_AT = datetime(2024, 7, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _nan_station() -> StationReport:
+    # A masked radar cell comes back from MRMS and Stage IV as NaN
+    return StationReport(
+        station_name="Broad Channel",
+        borough="Queens",
+        structure="At Grade",
+        latitude=40.608382,
+        longitude=-73.815925,
+        precip_rate_in_hr=float("nan"),
+        accum_1hr_in=1.0,
+        accum_6hr_in=float("inf"),
+        tide_level_ft=float("nan"),
+        jfk_daily_in=float("nan"),
+        risk_level=RiskLevel.LOW,
+    )
+
+
+def test_excel_report_writes_nan_as_empty_cell():
+    output = generate_excel_report([_nan_station()], "2024-07-01", GENERATED_AT, io.BytesIO())
+
+    sheet = load_workbook(output)["Flood Risk Report"]
+    row = dict(zip(COLUMN_NAMES, (cell.value for cell in sheet[2])))
+    assert row["Precip Rate (in/hr)"] is None
+    assert row["1hr Accumulation (in)"] == 1.0
+    assert row["6hr Accumulation (in)"] is None
+    assert row["Tide Level (ft)"] is None
+    assert row["JFK Daily (in)"] is None
+    assert row["GTFS Latitude"] == 40.608382
+
+
+def test_csv_report_writes_nan_as_empty_cell():
+    text = "".join(generate_csv_report([_nan_station()], "2024-07-01", GENERATED_AT))
+
+    header, row = csv.reader(io.StringIO(text))
+    row = dict(zip(header, row))
+    assert row["Precip Rate (in/hr)"] == ""
+    assert row["1hr Accumulation (in)"] == "1.0"
+    assert row["6hr Accumulation (in)"] == ""
+    assert row["Tide Level (ft)"] == ""
+    assert row["JFK Daily (in)"] == ""